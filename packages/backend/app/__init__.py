@@ -1,12 +1,21 @@
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 from .config import Settings
 from .extensions import db, jwt
+from . import json_provider
 from .routes import register_routes
+from .services import (
+    bill_reminders,
+    import_jobs,
+    metrics,
+    reminder_dispatch,
+    rollups,
+)
 from flask_cors import CORS
 import click
+import hmac
 import os
 import logging
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 
 def create_app(settings: Settings | None = None) -> Flask:
@@ -27,6 +36,11 @@ def create_app(settings: Settings | None = None) -> Flask:
         TWILIO_AUTH_TOKEN=cfg.twilio_auth_token,
         TWILIO_WHATSAPP_FROM=cfg.twilio_whatsapp_from,
         EMAIL_FROM=cfg.email_from,
+        INSIGHTS_CACHE_TTL_SECONDS=cfg.insights_cache_ttl_seconds,
+        IMPORT_JOB_BACKEND=cfg.import_job_backend,
+        IMPORT_JOB_TTL_SECONDS=cfg.import_job_ttl_seconds,
+        IMPORT_JOB_STALE_SECONDS=cfg.import_job_stale_seconds,
+        IMPORT_JOB_MAX_ATTEMPTS=cfg.import_job_max_attempts,
     )
 
     # Logging
@@ -39,6 +53,7 @@ def create_app(settings: Settings | None = None) -> Flask:
     logger.info("Starting FinMind backend with log level %s", log_level)
 
     # Extensions
+    json_provider.init_app(app, cfg.json_provider)
     db.init_app(app)
     jwt.init_app(app)
     # CORS for local dev frontend
@@ -52,6 +67,17 @@ def create_app(settings: Settings | None = None) -> Flask:
     def health():
         return jsonify(status="ok"), 200
 
+    @app.get("/metrics")
+    def metrics_counters():
+        # Operational counters aren't for API users; scrapers send the token.
+        if not cfg.metrics_token:
+            return jsonify(error="not found"), 404
+        expected = f"Bearer {cfg.metrics_token}"
+        given = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(given.encode(), expected.encode()):
+            return jsonify(error="unauthorized"), 401
+        return jsonify(counters=metrics.snapshot()), 200
+
     @app.cli.command("init-db")
     def init_db():
         """Initialize database schema from db/schema.sql"""
@@ -67,5 +93,127 @@ def create_app(settings: Settings | None = None) -> Flask:
                 click.echo("Database initialized.")
             finally:
                 conn.close()
+            # Dashboards read only from monthly_rollups, so a table that was
+            # just added to an existing database must be filled before use.
+            if rollups.needs_backfill():
+                rows, problems = rollups.rebuild_verified()
+                if problems:
+                    raise click.ClickException("rollup backfill did not verify")
+                click.echo(f"Backfilled {rows} rollup rows.")
+
+    @app.cli.command("rebuild-rollups")
+    @click.option("--user-id", type=int, default=None, help="Limit to one user")
+    def rebuild_rollups(user_id):
+        """Recompute monthly_rollups from expenses and verify the result"""
+        rows, problems = rollups.rebuild_verified(user_id)
+        for problem in problems:
+            click.echo(f"Mismatch: {problem}", err=True)
+        if problems:
+            raise click.ClickException(
+                "rollups do not match raw expenses; rebuild rolled back"
+            )
+        click.echo(f"Rebuilt {rows} rollup rows.")
+        click.echo("Rollups verified.")
+
+    @app.cli.command("import-worker")
+    @click.option("--burst", is_flag=True, help="Exit once the queue is empty")
+    def import_worker(burst):
+        """Process queued statement import jobs"""
+        click.echo("Import worker started.")
+        while True:
+            ran = import_jobs.work_once(timeout=1 if burst else 5)
+            if burst and not ran:
+                break
+
+    @app.cli.command("generate-reminders")
+    @click.option(
+        "--lookahead-days",
+        type=int,
+        default=cfg.bill_reminder_lookahead_days,
+        help="Create reminders for bills due within this many days",
+    )
+    def generate_reminders(lookahead_days):
+        """Create reminders for upcoming bills across all users"""
+        with app.app_context():
+            try:
+                count = bill_reminders.generate_due(lookahead_days=lookahead_days)
+            finally:
+                db.session.remove()
+        click.echo(f"Generated {count} reminders.")
+
+    @app.cli.command("dispatch-reminders")
+    @click.option(
+        "--once", is_flag=True, help="Generate and dispatch due reminders, then exit"
+    )
+    @click.option(
+        "--interval",
+        type=int,
+        default=cfg.reminder_dispatch_interval_seconds,
+        help="Seconds between scheduled runs",
+    )
+    def dispatch_reminders(once, interval):
+        """Generate bill reminders and send due ones for all users on a schedule"""
+        dispatcher = reminder_dispatch.ReminderDispatcher()
+
+        def generate():
+            with app.app_context():
+                try:
+                    count = bill_reminders.generate_due()
+                finally:
+                    db.session.remove()
+            click.echo(f"Generated {count} reminders.")
+
+        def run():
+            with app.app_context():
+                try:
+                    count = dispatcher.run_once()
+                finally:
+                    db.session.remove()
+            click.echo(f"Dispatched {count} reminders.")
+
+        def run_requested():
+            with app.app_context():
+                try:
+                    count = dispatcher.run_requested()
+                finally:
+                    db.session.remove()
+            if count:
+                click.echo(f"Dispatched {count} requested reminders.")
+
+        try:
+            if once:
+                generate()
+                run()
+                return
+            from apscheduler.schedulers.blocking import BlockingScheduler
+
+            scheduler = BlockingScheduler()
+            scheduler.add_job(
+                run,
+                "interval",
+                seconds=interval,
+                max_instances=1,
+                coalesce=True,
+                next_run_time=datetime.now(),
+            )
+            scheduler.add_job(
+                run_requested,
+                "interval",
+                seconds=cfg.reminder_run_request_poll_seconds,
+                max_instances=1,
+                coalesce=True,
+            )
+            scheduler.add_job(
+                generate,
+                "interval",
+                seconds=cfg.bill_reminder_generate_interval_seconds,
+                max_instances=1,
+                coalesce=True,
+                next_run_time=datetime.now(),
+            )
+            click.echo("Reminder dispatcher started.")
+            scheduler.start()
+        finally:
+            dispatcher.close()
 
     return app
@@ -26,10 +26,26 @@ CREATE TABLE IF NOT EXISTS expenses (
   created_at TIMESTAMP NOT NULL DEFAULT NOW()
 );
 CREATE INDEX IF NOT EXISTS idx_expenses_user_spent_at ON expenses(user_id, spent_at DESC);
+-- Full-text search over notes (prefix matching via to_tsquery 'term:*').
+CREATE INDEX IF NOT EXISTS idx_expenses_notes_fts ON expenses
+  USING GIN (to_tsvector('simple', coalesce(notes, '')));
 
 ALTER TABLE expenses
   ADD COLUMN IF NOT EXISTS expense_type VARCHAR(20) NOT NULL DEFAULT 'EXPENSE';
 
+-- Per-user monthly totals maintained alongside expense writes.
+-- category_id 0 means uncategorized (primary key columns cannot be NULL).
+-- `flask init-db` backfills it when empty; repair with `flask rebuild-rollups`.
+CREATE TABLE IF NOT EXISTS monthly_rollups (
+  user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  month DATE NOT NULL,
+  category_id INT NOT NULL DEFAULT 0,
+  expense_type VARCHAR(20) NOT NULL,
+  total_amount NUMERIC(14,2) NOT NULL DEFAULT 0,
+  tx_count INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, month, category_id, expense_type)
+);
+
 DO $$ BEGIN
   CREATE TYPE bill_cadence AS ENUM ('MONTHLY','WEEKLY','YEARLY','ONCE');
 EXCEPTION
@@ -44,12 +60,17 @@ CREATE TABLE IF NOT EXISTS bills (
   currency VARCHAR(10) NOT NULL DEFAULT 'USD',
   next_due_date DATE NOT NULL,
   cadence bill_cadence NOT NULL,
+  due_day SMALLINT,
   channel_whatsapp BOOLEAN NOT NULL DEFAULT FALSE,
   channel_email BOOLEAN NOT NULL DEFAULT TRUE,
   active BOOLEAN NOT NULL DEFAULT TRUE,
   created_at TIMESTAMP NOT NULL DEFAULT NOW()
 );
 CREATE INDEX IF NOT EXISTS idx_bills_user_due ON bills(user_id, next_due_date);
+-- Cross-user keyset scan used by the bill reminder generator
+CREATE INDEX IF NOT EXISTS idx_bills_active_due ON bills(active, next_due_date, id);
+
+ALTER TABLE bills ADD COLUMN IF NOT EXISTS due_day SMALLINT;
 
 CREATE TABLE IF NOT EXISTS reminders (
   id SERIAL PRIMARY KEY,
@@ -58,9 +79,16 @@ CREATE TABLE IF NOT EXISTS reminders (
   message VARCHAR(500) NOT NULL,
   send_at TIMESTAMP NOT NULL,
   sent BOOLEAN NOT NULL DEFAULT FALSE,
-  channel VARCHAR(20) NOT NULL DEFAULT 'email'
+  channel VARCHAR(20) NOT NULL DEFAULT 'email',
+  attempts SMALLINT NOT NULL DEFAULT 0
 );
+ALTER TABLE reminders ADD COLUMN IF NOT EXISTS attempts SMALLINT NOT NULL DEFAULT 0;
 CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders(user_id, sent, send_at);
+-- Cross-user scan used by the reminder dispatcher
+CREATE INDEX IF NOT EXISTS idx_reminders_pending ON reminders(send_at) WHERE sent = FALSE;
+-- One generated reminder per bill, send time and channel
+CREATE UNIQUE INDEX IF NOT EXISTS uq_reminders_bill_send_channel
+  ON reminders(bill_id, send_at, channel);
 
 CREATE TABLE IF NOT EXISTS ad_impressions (
   id SERIAL PRIMARY KEY,
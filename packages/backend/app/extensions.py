@@ -9,3 +9,5 @@ jwt = JWTManager()
 
 _settings = Settings()
 redis_client = redis.Redis.from_url(_settings.redis_url, decode_responses=True)
+# Raw-bytes client for binary payloads (uploads, compressed cache entries).
+redis_binary_client = redis.Redis.from_url(_settings.redis_url)
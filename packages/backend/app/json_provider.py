@@ -0,0 +1,78 @@
+import json
+from typing import Any
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _version(v: str) -> tuple[int, ...]:
+    return tuple(int(p) for p in v.split(".")[:3] if p.isdigit())
+
+
+# orjson before 3.9.15 recurses without a depth limit while parsing
+# (CVE-2024-27454); deeply nested request bodies could crash the process.
+_ORJSON_SAFE_LOADS = orjson is not None and _version(orjson.__version__) >= (3, 9, 15)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask's default JSON behaviour, encoded with orjson.
+
+    Output keeps the default provider's contract: sorted keys, dates as HTTP
+    dates, Decimal and UUID as strings, and compact bodies ending in a newline
+    (indented in debug mode). Calls with extra json.dumps/loads arguments, and
+    parsing with an orjson too old to limit nesting depth, go through the
+    stdlib implementation.
+    """
+
+    def _options(self) -> int:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if kwargs or not _ORJSON_SAFE_LOADS:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(
+            obj,
+            default=self.default,
+            option=self._options() | orjson.OPT_APPEND_NEWLINE,
+        )
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_app(app: Flask, kind: str = "auto"):
+    """Install the JSON provider: "orjson", "std", or "auto" (orjson if installed)."""
+    if kind == "orjson" and orjson is None:
+        raise RuntimeError("JSON_PROVIDER=orjson but orjson is not installed")
+    if kind in ("auto", "orjson") and orjson is not None:
+        app.json = OrjsonProvider(app)
+    else:
+        app.json = DefaultJSONProvider(app)
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON for cache payloads; like json.dumps, only plain JSON types."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def loads(raw: str | bytes) -> Any:
+    return orjson.loads(raw) if _ORJSON_SAFE_LOADS else json.loads(raw)
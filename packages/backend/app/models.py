@@ -1,5 +1,6 @@
 from datetime import datetime, date
 from enum import Enum
+from sqlalchemy import DDL, event, false
 from sqlalchemy import Enum as SAEnum
 from .extensions import db
 
@@ -38,6 +39,56 @@ class Expense(db.Model):
     spent_at = db.Column(db.Date, default=date.today, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (db.Index("idx_expenses_user_spent_at", user_id, spent_at.desc()),)
+
+
+# Full-text search over notes: a GIN expression index on Postgres (mirrors
+# db/schema.sql) and an external-content FTS5 table kept in sync by triggers on
+# SQLite. See services/search.py for the matching query side.
+_EXPENSE_SEARCH_DDL = {
+    "postgresql": [
+        "CREATE INDEX IF NOT EXISTS idx_expenses_notes_fts ON expenses "
+        "USING GIN (to_tsvector('simple', coalesce(notes, '')))",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS expenses_fts USING fts5("
+        "notes, content='expenses', content_rowid='id')",
+        "CREATE TRIGGER IF NOT EXISTS expenses_fts_ai AFTER INSERT ON expenses "
+        "BEGIN INSERT INTO expenses_fts(rowid, notes) "
+        "VALUES (new.id, new.notes); END",
+        "CREATE TRIGGER IF NOT EXISTS expenses_fts_ad AFTER DELETE ON expenses "
+        "BEGIN INSERT INTO expenses_fts(expenses_fts, rowid, notes) "
+        "VALUES ('delete', old.id, old.notes); END",
+        "CREATE TRIGGER IF NOT EXISTS expenses_fts_au AFTER UPDATE OF notes "
+        "ON expenses BEGIN INSERT INTO expenses_fts(expenses_fts, rowid, notes) "
+        "VALUES ('delete', old.id, old.notes); "
+        "INSERT INTO expenses_fts(rowid, notes) VALUES (new.id, new.notes); END",
+    ],
+}
+for _dialect, _statements in _EXPENSE_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(
+            Expense.__table__,
+            "after_create",
+            DDL(_statement).execute_if(dialect=_dialect),
+        )
+event.listen(
+    Expense.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS expenses_fts").execute_if(dialect="sqlite"),
+)
+
+
+class MonthlyRollup(db.Model):
+    __tablename__ = "monthly_rollups"
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    month = db.Column(db.Date, primary_key=True)
+    # 0 stands for uncategorized; primary key columns cannot be NULL.
+    category_id = db.Column(db.Integer, primary_key=True, default=0)
+    expense_type = db.Column(db.String(20), primary_key=True)
+    total_amount = db.Column(db.Numeric(14, 2), default=0, nullable=False)
+    tx_count = db.Column(db.Integer, default=0, nullable=False)
+
 
 class BillCadence(str, Enum):
     MONTHLY = "MONTHLY"
@@ -55,10 +106,13 @@ class Bill(db.Model):
     currency = db.Column(db.String(10), default="USD", nullable=False)
     next_due_date = db.Column(db.Date, nullable=False)
     cadence = db.Column(SAEnum(BillCadence), nullable=False)
+    # Intended day of month; next_due_date may be clamped to a shorter month.
+    due_day = db.Column(db.SmallInteger, nullable=True)
     channel_whatsapp = db.Column(db.Boolean, default=False, nullable=False)
     channel_email = db.Column(db.Boolean, default=True, nullable=False)
     active = db.Column(db.Boolean, default=True, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    __table_args__ = (db.Index("idx_bills_active_due", active, next_due_date, id),)
 
 
 class Reminder(db.Model):
@@ -70,6 +124,21 @@ class Reminder(db.Model):
     send_at = db.Column(db.DateTime, nullable=False)
     sent = db.Column(db.Boolean, default=False, nullable=False)
     channel = db.Column(db.String(20), default="email", nullable=False)
+    # Failed delivery attempts; the dispatcher gives up after a few.
+    attempts = db.Column(db.SmallInteger, default=0, nullable=False)
+    __table_args__ = (
+        # "= false" to match schema.sql; Postgres won't use a partial index
+        # on "sent = false" for a query saying "sent IS false".
+        db.Index(
+            "idx_reminders_pending",
+            send_at,
+            postgresql_where=sent == false(),
+            sqlite_where=sent == false(),
+        ),
+        db.Index(
+            "uq_reminders_bill_send_channel", bill_id, send_at, channel, unique=True
+        ),
+    )
 
 
 class AdImpression(db.Model):
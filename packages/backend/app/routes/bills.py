@@ -1,9 +1,11 @@
-from datetime import date, timedelta
+from datetime import date
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import Float, cast, select
 from ..extensions import db
 from ..models import Bill, BillCadence
-from ..services.cache import cache_delete_patterns
+from ..services import recurrence
+from ..services.cache import cache_delete_patterns, forecast_key
 import logging
 
 bp = Blueprint("bills", __name__)
@@ -14,19 +16,27 @@ logger = logging.getLogger("finmind.bills")
 @jwt_required()
 def list_bills():
     uid = int(get_jwt_identity())
-    items = (
-        db.session.query(Bill)
-        .filter_by(user_id=uid, active=True)
+    items = db.session.execute(
+        select(
+            Bill.id,
+            Bill.name,
+            cast(Bill.amount, Float).label("amount"),
+            Bill.currency,
+            Bill.next_due_date,
+            Bill.cadence,
+            Bill.channel_whatsapp,
+            Bill.channel_email,
+        )
+        .where(Bill.user_id == uid, Bill.active.is_(True))
         .order_by(Bill.next_due_date)
-        .all()
-    )
+    ).all()
     logger.info("List bills user=%s count=%s", uid, len(items))
     return jsonify(
         [
             {
                 "id": b.id,
                 "name": b.name,
-                "amount": float(b.amount),
+                "amount": b.amount,
                 "currency": b.currency,
                 "next_due_date": b.next_due_date.isoformat(),
                 "cadence": b.cadence.value,
@@ -43,12 +53,14 @@ def list_bills():
 def create_bill():
     uid = int(get_jwt_identity())
     data = request.get_json() or {}
+    next_due_date = date.fromisoformat(data["next_due_date"])
     b = Bill(
         user_id=uid,
         name=data["name"],
         amount=data["amount"],
         currency=data.get("currency", "USD"),
-        next_due_date=date.fromisoformat(data["next_due_date"]),
+        next_due_date=next_due_date,
+        due_day=next_due_date.day,
         cadence=BillCadence(data.get("cadence", "MONTHLY")),
         channel_whatsapp=bool(data.get("channel_whatsapp", False)),
         channel_email=bool(data.get("channel_email", True)),
@@ -57,7 +69,11 @@ def create_bill():
     db.session.commit()
     logger.info("Created bill id=%s user=%s name=%s", b.id, uid, b.name)
     cache_delete_patterns(
-        [f"user:{uid}:upcoming_bills*", f"user:{uid}:dashboard_summary:*"]
+        [
+            f"user:{uid}:upcoming_bills*",
+            f"user:{uid}:dashboard_summary:*",
+            forecast_key(uid, "*"),
+        ]
     )
     return jsonify(id=b.id), 201
 
@@ -69,20 +85,87 @@ def mark_paid(bill_id: int):
     b = db.session.get(Bill, bill_id)
     if not b or b.user_id != uid:
         return jsonify(error="not found"), 404
-    # Move next due date based on cadence
-    if b.cadence == BillCadence.MONTHLY:
-        b.next_due_date = b.next_due_date + timedelta(days=30)
-    elif b.cadence == BillCadence.WEEKLY:
-        b.next_due_date = b.next_due_date + timedelta(days=7)
-    elif b.cadence == BillCadence.YEARLY:
-        b.next_due_date = b.next_due_date + timedelta(days=365)
-    else:
+    if b.due_day is None:
+        b.due_day = b.next_due_date.day
+    next_due_date = recurrence.next_occurrence(b.next_due_date, b.cadence, b.due_day)
+    if next_due_date is None:
         b.active = False
+    else:
+        b.next_due_date = next_due_date
     db.session.commit()
     cache_delete_patterns(
-        [f"user:{uid}:upcoming_bills*", f"user:{uid}:dashboard_summary:*"]
+        [
+            f"user:{uid}:upcoming_bills*",
+            f"user:{uid}:dashboard_summary:*",
+            forecast_key(uid, "*"),
+        ]
     )
     logger.info(
         "Marked bill paid id=%s user=%s next_due_date=%s", b.id, uid, b.next_due_date
     )
     return jsonify(message="updated")
+
+
+@bp.get("/cashflow")
+@jwt_required()
+def cashflow():
+    """Upcoming bill payments over the next ``months`` calendar months."""
+    uid = int(get_jwt_identity())
+    try:
+        months = int(request.args.get("months", "3"))
+    except ValueError:
+        return jsonify(error="invalid months"), 400
+    if not 1 <= months <= 24:
+        return jsonify(error="months must be between 1 and 24"), 400
+    today = date.today()
+    until = recurrence.add_months(today, months)
+    bills = (
+        db.session.query(
+            Bill.id,
+            Bill.name,
+            Bill.amount,
+            Bill.currency,
+            Bill.next_due_date,
+            Bill.cadence,
+            Bill.due_day,
+        )
+        .filter_by(user_id=uid, active=True)
+        .all()
+    )
+    positions, dates = recurrence.project(
+        [b.next_due_date for b in bills],
+        [b.cadence for b in bills],
+        [b.due_day for b in bills],
+        until,
+        start=today,
+    )
+    occurrences = []
+    totals: dict[tuple[str, str], float] = {}
+    for i, due in zip(positions.tolist(), dates.tolist()):
+        b = bills[i]
+        amount = float(b.amount)
+        occurrences.append(
+            {
+                "bill_id": b.id,
+                "name": b.name,
+                "amount": amount,
+                "currency": b.currency,
+                "date": due.isoformat(),
+            }
+        )
+        key = (due.strftime("%Y-%m"), b.currency)
+        totals[key] = totals.get(key, 0.0) + amount
+    logger.info(
+        "Bill cashflow user=%s months=%s occurrences=%s", uid, months, len(occurrences)
+    )
+    return jsonify(
+        {
+            "from": today.isoformat(),
+            "until": until.isoformat(),
+            "occurrences": occurrences,
+            "totals": [
+                {"month": month, "currency": currency, "amount": round(total, 2)}
+                for (month, currency), total in sorted(totals.items())
+            ],
+        }
+    )
@@ -1,8 +1,11 @@
 import logging
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import update
 from ..extensions import db
-from ..models import Category
+from ..models import Category, Expense
+from ..services import expense_snapshot, rollups
+from ..services.cache import cache_delete_patterns
 
 bp = Blueprint("categories", __name__)
 logger = logging.getLogger("finmind.categories")
@@ -63,7 +66,16 @@ def delete_category(category_id: int):
     c = db.session.get(Category, category_id)
     if not c or c.user_id != uid:
         return jsonify(error="not found"), 404
+    # Mirror ON DELETE SET NULL explicitly so rollups stay in step on any backend
+    db.session.execute(
+        update(Expense)
+        .where(Expense.user_id == uid, Expense.category_id == c.id)
+        .values(category_id=None)
+    )
+    rollups.move_category_to_uncategorized(uid, c.id)
     db.session.delete(c)
     db.session.commit()
+    expense_snapshot.record_category_removed(uid, c.id)
+    cache_delete_patterns([f"user:{uid}:dashboard_summary:*", f"insights:{uid}:*"])
     logger.info("Deleted category id=%s user=%s", c.id, uid)
     return jsonify(message="deleted")
@@ -1,11 +1,12 @@
 from datetime import date
-from sqlalchemy import extract, func
-from flask import Blueprint, jsonify, request
+from sqlalchemy import Float, cast, func, select
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 from ..extensions import db
-from ..models import Bill, Expense, Category
-from ..services.cache import cache_get, cache_set, dashboard_summary_key
+from ..models import Bill, Category, Expense, MonthlyRollup
+from ..services.cache import cache_get_raw, cache_set_raw, dashboard_summary_key
+from ..services.queries import month_range, sum_where
 
 bp = Blueprint("dashboard", __name__)
 
@@ -18,9 +19,10 @@ def dashboard_summary():
     if not _is_valid_month(ym):
         return jsonify(error="invalid month, expected YYYY-MM"), 400
     key = dashboard_summary_key(uid, ym)
-    cached = cache_get(key)
+    cached = cache_get_raw(key)
     if cached:
-        return jsonify(cached)
+        # Stored as the encoded response body; serve it without a decode/encode.
+        return current_app.response_class(cached, mimetype=current_app.json.mimetype)
 
     payload = {
         "period": {"month": ym},
@@ -37,53 +39,81 @@ def dashboard_summary():
         "errors": [],
     }
 
-    year, month = map(int, ym.split("-"))
     today = date.today()
 
     try:
-        income = (
-            db.session.query(func.coalesce(func.sum(Expense.amount), 0))
-            .filter(
-                Expense.user_id == uid,
-                extract("year", Expense.spent_at) == year,
-                extract("month", Expense.spent_at) == month,
-                Expense.expense_type == "INCOME",
+        is_income = MonthlyRollup.expense_type == "INCOME"
+        month_rows = (
+            db.session.query(
+                MonthlyRollup.category_id,
+                func.coalesce(Category.name, "Uncategorized").label("category_name"),
+                sum_where(MonthlyRollup.total_amount, is_income).label("income_amount"),
+                sum_where(MonthlyRollup.total_amount, ~is_income).label(
+                    "expense_amount"
+                ),
+                sum_where(MonthlyRollup.tx_count, ~is_income).label("expense_count"),
+            )
+            .outerjoin(
+                Category,
+                (Category.id == MonthlyRollup.category_id) & (Category.user_id == uid),
             )
-            .scalar()
-        )
-        expenses = (
-            db.session.query(func.coalesce(func.sum(Expense.amount), 0))
             .filter(
-                Expense.user_id == uid,
-                extract("year", Expense.spent_at) == year,
-                extract("month", Expense.spent_at) == month,
-                Expense.expense_type != "INCOME",
+                MonthlyRollup.user_id == uid,
+                MonthlyRollup.month == month_range(ym)[0],
             )
-            .scalar()
-        )
-        payload["summary"]["monthly_income"] = float(income or 0)
-        payload["summary"]["monthly_expenses"] = float(expenses or 0)
-        payload["summary"]["net_flow"] = round(
-            payload["summary"]["monthly_income"]
-            - payload["summary"]["monthly_expenses"],
-            2,
+            .group_by(MonthlyRollup.category_id, Category.name)
+            .all()
         )
     except Exception:
+        month_rows = None
         payload["errors"].append("summary_unavailable")
+        payload["errors"].append("category_breakdown_unavailable")
+
+    if month_rows is not None:
+        category_rows = sorted(
+            (r for r in month_rows if r.expense_count),
+            key=lambda r: r.expense_amount or 0,
+            reverse=True,
+        )
+        income = float(sum(r.income_amount or 0 for r in month_rows))
+        total = float(sum(r.expense_amount or 0 for r in category_rows))
+        payload["summary"]["monthly_income"] = income
+        payload["summary"]["monthly_expenses"] = total
+        payload["summary"]["net_flow"] = round(income - total, 2)
+        payload["category_breakdown"] = [
+            {
+                "category_id": r.category_id or None,
+                "category_name": r.category_name,
+                "amount": float(r.expense_amount or 0),
+                "share_pct": (
+                    round((float(r.expense_amount or 0) / total) * 100, 2)
+                    if total > 0
+                    else 0
+                ),
+            }
+            for r in category_rows
+        ]
 
     try:
-        rows = (
-            db.session.query(Expense)
-            .filter(Expense.user_id == uid)
+        rows = db.session.execute(
+            select(
+                Expense.id,
+                Expense.notes,
+                cast(Expense.amount, Float).label("amount"),
+                Expense.spent_at,
+                Expense.expense_type,
+                Expense.category_id,
+                Expense.currency,
+            )
+            .where(Expense.user_id == uid)
             .order_by(Expense.spent_at.desc(), Expense.id.desc())
             .limit(10)
-            .all()
-        )
+        ).all()
         payload["recent_transactions"] = [
             {
                 "id": e.id,
                 "description": e.notes or "Transaction",
-                "amount": float(e.amount),
+                "amount": e.amount,
                 "date": e.spent_at.isoformat(),
                 "type": e.expense_type,
                 "category_id": e.category_id,
@@ -126,46 +156,9 @@ def dashboard_summary():
     except Exception:
         payload["errors"].append("upcoming_bills_unavailable")
 
-    try:
-        category_rows = (
-            db.session.query(
-                Expense.category_id,
-                func.coalesce(Category.name, "Uncategorized").label("category_name"),
-                func.coalesce(func.sum(Expense.amount), 0).label("total_amount"),
-            )
-            .outerjoin(
-                Category,
-                (Category.id == Expense.category_id) & (Category.user_id == uid),
-            )
-            .filter(
-                Expense.user_id == uid,
-                extract("year", Expense.spent_at) == year,
-                extract("month", Expense.spent_at) == month,
-                Expense.expense_type != "INCOME",
-            )
-            .group_by(Expense.category_id, Category.name)
-            .order_by(func.sum(Expense.amount).desc())
-            .all()
-        )
-        total = sum(float(r.total_amount or 0) for r in category_rows)
-        payload["category_breakdown"] = [
-            {
-                "category_id": r.category_id,
-                "category_name": r.category_name,
-                "amount": float(r.total_amount or 0),
-                "share_pct": (
-                    round((float(r.total_amount or 0) / total) * 100, 2)
-                    if total > 0
-                    else 0
-                ),
-            }
-            for r in category_rows
-        ]
-    except Exception:
-        payload["errors"].append("category_breakdown_unavailable")
-
-    cache_set(key, payload, ttl_seconds=300)
-    return jsonify(payload)
+    response = jsonify(payload)
+    cache_set_raw(key, response.get_data(), ttl_seconds=300)
+    return response
 
 
 def _is_valid_month(ym: str) -> bool:
@@ -1,12 +1,15 @@
+import base64
 from datetime import date
 from decimal import Decimal, InvalidOperation
 
 from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import Float, cast, select, tuple_
 from ..extensions import db
 from ..models import Expense
 from ..services.cache import cache_delete_patterns, monthly_summary_key
-from ..services import expense_import
+from ..services import expense_import, expense_snapshot, import_jobs, rollups
+from ..services.search import search_expenses
 import logging
 
 bp = Blueprint("expenses", __name__)
@@ -17,7 +20,8 @@ logger = logging.getLogger("finmind.expenses")
 @jwt_required()
 def list_expenses():
     uid = int(get_jwt_identity())
-    q = db.session.query(Expense).filter_by(user_id=uid)
+    # Plain rows: read-only pages skip identity-map hydration and Decimal amounts.
+    q = select(*_LIST_COLUMNS).where(Expense.user_id == uid)
     from_date = request.args.get("from")
     to_date = request.args.get("to")
     search = (request.args.get("search") or "").strip()
@@ -37,18 +41,37 @@ def list_expenses():
             q = q.filter(Expense.category_id == int(category_id))
     except ValueError:
         return jsonify(error="invalid filter values"), 400
+    rank = None
     if search:
-        q = q.filter(Expense.notes.ilike(f"%{search}%"))
+        q, rank = search_expenses(q, search)
+        if rank is None:
+            q = q.filter(Expense.notes.ilike(f"%{search}%"))
+    chronological = (Expense.spent_at.desc(), Expense.id.desc())
 
-    items = (
-        q.order_by(Expense.spent_at.desc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
-    )
+    if "cursor" in request.args:
+        # Keyset mode: seek past the last (spent_at, id) seen instead of OFFSET.
+        q = q.order_by(*chronological)
+        raw_cursor = request.args.get("cursor") or ""
+        if raw_cursor:
+            after = _decode_cursor(raw_cursor)
+            if after is None:
+                return jsonify(error="invalid cursor"), 400
+            q = q.filter(tuple_(Expense.spent_at, Expense.id) < tuple_(*after))
+        items = db.session.execute(q.limit(page_size + 1)).all()
+        next_cursor = None
+        if len(items) > page_size:
+            items = items[:page_size]
+            next_cursor = _encode_cursor(items[-1])
+        logger.info("List expenses user=%s count=%s keyset", uid, len(items))
+        return jsonify(items=_rows_to_dicts(items), next_cursor=next_cursor)
+
+    if rank is not None:
+        q = q.order_by(rank, *chronological)
+    else:
+        q = q.order_by(*chronological)
+    items = db.session.execute(q.offset((page - 1) * page_size).limit(page_size)).all()
     logger.info("List expenses user=%s count=%s", uid, len(items))
-    data = [_expense_to_dict(e) for e in items]
-    return jsonify(data)
+    return jsonify(_rows_to_dicts(items))
 
 
 @bp.post("")
@@ -73,7 +96,11 @@ def create_expense():
         spent_at=date.fromisoformat(raw_date) if raw_date else date.today(),
     )
     db.session.add(e)
+    deltas = rollups.RollupDeltas()
+    deltas.add_expense(e)
+    rollups.apply_deltas(deltas)
     db.session.commit()
+    expense_snapshot.record_expense(e)
     logger.info("Created expense id=%s user=%s amount=%s", e.id, uid, e.amount)
     # Invalidate caches
     cache_delete_patterns(
@@ -93,6 +120,9 @@ def update_expense(expense_id: int):
     if not e or e.user_id != uid:
         return jsonify(error="not found"), 404
     data = request.get_json() or {}
+    deltas = rollups.RollupDeltas()
+    deltas.add_expense(e, sign=-1)
+    old_spent_at = e.spent_at.isoformat()
     if "amount" in data:
         amount = _parse_amount(data.get("amount"))
         if amount is None:
@@ -112,8 +142,13 @@ def update_expense(expense_id: int):
     if "date" in data or "spent_at" in data:
         raw_date = data.get("date") or data.get("spent_at")
         e.spent_at = date.fromisoformat(raw_date)
+    deltas.add_expense(e)
+    rollups.apply_deltas(deltas)
     db.session.commit()
+    expense_snapshot.record_expense(e)
     _invalidate_expense_cache(uid, e.spent_at.isoformat())
+    if old_spent_at[:7] != e.spent_at.isoformat()[:7]:
+        _invalidate_expense_cache(uid, old_spent_at)
     return jsonify(_expense_to_dict(e))
 
 
@@ -125,8 +160,12 @@ def delete_expense(expense_id: int):
     if not e or e.user_id != uid:
         return jsonify(error="not found"), 404
     spent_at = e.spent_at.isoformat()
+    deltas = rollups.RollupDeltas()
+    deltas.add_expense(e, sign=-1)
     db.session.delete(e)
+    rollups.apply_deltas(deltas)
     db.session.commit()
+    expense_snapshot.record_delete(uid, expense_id)
     _invalidate_expense_cache(uid, spent_at)
     return jsonify(message="deleted")
 
@@ -138,24 +177,47 @@ def import_preview():
     file = request.files.get("file")
     if not file:
         return jsonify(error="file required"), 400
-    raw = file.read()
     try:
-        rows = expense_import.extract_transactions_from_statement(
+        result = expense_import.preview_statement(
+            uid,
             filename=file.filename or "",
             content_type=file.content_type,
-            data=raw,
+            data=file.stream,
             gemini_api_key=current_app.config.get("GEMINI_API_KEY"),
             gemini_model=current_app.config.get("GEMINI_MODEL", "gemini-1.5-flash"),
         )
-        transactions = expense_import.normalize_import_rows(rows)
     except ValueError as exc:
         return jsonify(error=str(exc)), 400
     except Exception as exc:  # pragma: no cover
         logger.exception("Import preview failed user=%s", uid)
         return jsonify(error=f"failed to parse statement: {exc}"), 500
-    duplicates = sum(1 for t in transactions if _is_duplicate(uid, t))
+    return jsonify(result)
+
+
+@bp.post("/import/jobs")
+@jwt_required()
+def submit_import_job():
+    uid = int(get_jwt_identity())
+    file = request.files.get("file")
+    if not file:
+        return jsonify(error="file required"), 400
+    job = import_jobs.submit(uid, file.filename or "", file.content_type, file.read())
+    return jsonify(job_id=job["id"], status=job["status"]), 202
+
+
+@bp.get("/import/jobs/<job_id>")
+@jwt_required()
+def get_import_job(job_id: str):
+    uid = int(get_jwt_identity())
+    job = import_jobs.get_job(job_id, uid)
+    if not job:
+        return jsonify(error="not found"), 404
     return jsonify(
-        total=len(transactions), duplicates=duplicates, transactions=transactions
+        job_id=job["id"],
+        status=job["status"],
+        processed=job.get("processed", 0),
+        error=job.get("error"),
+        result=job.get("result"),
     )
 
 
@@ -167,32 +229,42 @@ def import_commit():
     rows = data.get("transactions") or []
     if not isinstance(rows, list) or not rows:
         return jsonify(error="transactions required"), 400
-    transactions = expense_import.normalize_import_rows(rows)
-    inserted = 0
-    duplicates = 0
-    touched_months: set[str] = set()
-    for t in transactions:
-        if _is_duplicate(uid, t):
-            duplicates += 1
-            continue
-        expense = Expense(
-            user_id=uid,
-            amount=t["amount"],
-            currency=t.get("currency", "USD"),
-            expense_type=str(t.get("expense_type") or "EXPENSE").upper(),
-            category_id=t.get("category_id"),
-            notes=t["description"],
-            spent_at=date.fromisoformat(t["date"]),
-        )
-        db.session.add(expense)
-        inserted += 1
-        touched_months.add(t["date"][:7])
+    inserted, duplicates, touched_months = expense_import.commit_transactions(uid, rows)
     db.session.commit()
+    if inserted:
+        expense_snapshot.invalidate(uid)
     for ym in touched_months:
         _invalidate_expense_cache(uid, ym + "-01")
     return jsonify(inserted=inserted, duplicates=duplicates), 201
 
 
+_LIST_COLUMNS = (
+    Expense.id,
+    cast(Expense.amount, Float).label("amount"),
+    Expense.currency,
+    Expense.category_id,
+    Expense.expense_type,
+    Expense.notes,
+    Expense.spent_at,
+)
+
+
+def _rows_to_dicts(rows) -> list[dict]:
+    """Same shape as _expense_to_dict, for _LIST_COLUMNS rows."""
+    return [
+        {
+            "id": id_,
+            "amount": amount,
+            "currency": currency,
+            "category_id": category_id,
+            "expense_type": expense_type,
+            "description": notes or "",
+            "date": spent_at.isoformat(),
+        }
+        for id_, amount, currency, category_id, expense_type, notes, spent_at in rows
+    ]
+
+
 def _expense_to_dict(e: Expense) -> dict:
     return {
         "id": e.id,
@@ -205,6 +277,21 @@ def _expense_to_dict(e: Expense) -> dict:
     }
 
 
+def _encode_cursor(e: Expense) -> str:
+    raw = f"{e.spent_at.isoformat()}:{e.id}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(raw: str) -> tuple[date, int] | None:
+    try:
+        padded = raw + "=" * (-len(raw) % 4)
+        decoded = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii")
+        spent_at, expense_id = decoded.split(":", 1)
+        return date.fromisoformat(spent_at), int(expense_id)
+    except ValueError:
+        return None
+
+
 def _parse_amount(raw) -> Decimal | None:
     try:
         return Decimal(str(raw)).quantize(Decimal("0.01"))
@@ -212,23 +299,6 @@ def _parse_amount(raw) -> Decimal | None:
         return None
 
 
-def _is_duplicate(uid: int, row: dict) -> bool:
-    amount = _parse_amount(row["amount"])
-    if amount is None:
-        return False
-    return (
-        db.session.query(Expense)
-        .filter_by(
-            user_id=uid,
-            spent_at=date.fromisoformat(row["date"]),
-            amount=amount,
-            notes=row["description"],
-        )
-        .first()
-        is not None
-    )
-
-
 def _invalidate_expense_cache(uid: int, at: str):
     ym = at[:7]
     cache_delete_patterns(
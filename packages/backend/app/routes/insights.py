@@ -1,7 +1,10 @@
 from datetime import date
-from flask import Blueprint, jsonify
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..services.ai import monthly_budget_suggestion
+from ..services.ai import is_fallback_suggestion, monthly_budget_suggestion
+from ..services.cache import cache_get_or_compute, forecast_key, insights_key
+from ..services.forecast import forecast as build_user_forecast
+from ..services.http_clients import openai_call_budget_seconds
 import logging
 
 bp = Blueprint("insights", __name__)
@@ -13,6 +16,42 @@ logger = logging.getLogger("finmind.insights")
 def budget_suggestion():
     uid = int(get_jwt_identity())
     ym = date.today().strftime("%Y-%m")
-    suggestion = monthly_budget_suggestion(uid, ym)
+    # Expense and category writes clear insights:{uid}:*, so the TTL only
+    # bounds how long an unchanged month keeps its LLM answer. A fallback
+    # from a failed OpenAI call isn't cached, so the next request retries.
+    # The lock and wait cover the slowest OpenAI call so misses coalesce.
+    budget = openai_call_budget_seconds()
+    suggestion = cache_get_or_compute(
+        insights_key(uid, ym),
+        lambda: monthly_budget_suggestion(uid, ym),
+        ttl_seconds=current_app.config.get("INSIGHTS_CACHE_TTL_SECONDS", 6 * 3600),
+        metric="cache.insights",
+        lock_seconds=int(budget) + 30,
+        wait_seconds=budget,
+        cache_if=lambda s: not is_fallback_suggestion(s),
+    )
     logger.info("Budget suggestion served user=%s month=%s", uid, ym)
     return jsonify(suggestion)
+
+
+@bp.get("/forecast")
+@jwt_required()
+def forecast():
+    uid = int(get_jwt_identity())
+    try:
+        opening = float(request.args.get("balance", "0"))
+    except ValueError:
+        return jsonify(error="invalid balance"), 400
+    today = date.today()
+    result = cache_get_or_compute(
+        forecast_key(uid, today.isoformat()),
+        lambda: build_user_forecast(uid, today),
+        ttl_seconds=current_app.config.get("INSIGHTS_CACHE_TTL_SECONDS", 6 * 3600),
+        metric="cache.forecast",
+    )
+    # The cached series starts from zero so any opening balance can reuse it.
+    if opening:
+        for day in result["days"]:
+            day["balance"] = round(day["balance"] + opening, 2)
+    logger.info("Forecast served user=%s days=%s", uid, len(result["days"]))
+    return jsonify(result)
@@ -1,9 +1,10 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select
 from ..extensions import db
 from ..models import Reminder
-from ..services.reminders import send_reminder
+from ..services.reminder_dispatch import request_run
 import logging
 
 bp = Blueprint("reminders", __name__)
@@ -14,12 +15,17 @@ logger = logging.getLogger("finmind.reminders")
 @jwt_required()
 def list_reminders():
     uid = int(get_jwt_identity())
-    items = (
-        db.session.query(Reminder)
-        .filter_by(user_id=uid)
+    items = db.session.execute(
+        select(
+            Reminder.id,
+            Reminder.message,
+            Reminder.send_at,
+            Reminder.sent,
+            Reminder.channel,
+        )
+        .where(Reminder.user_id == uid)
         .order_by(Reminder.send_at)
-        .all()
-    )
+    ).all()
     logger.info("List reminders user=%s count=%s", uid, len(items))
     return jsonify(
         [
@@ -56,19 +62,7 @@ def create_reminder():
 @jwt_required()
 def run_due():
     uid = int(get_jwt_identity())
-    now = datetime.utcnow() + timedelta(minutes=1)
-    items = (
-        db.session.query(Reminder)
-        .filter(
-            Reminder.user_id == uid,
-            Reminder.sent.is_(False),
-            Reminder.send_at <= now,
-        )
-        .all()
-    )
-    for r in items:
-        send_reminder(r)
-        r.sent = True
-    db.session.commit()
-    logger.info("Processed due reminders user=%s count=%s", uid, len(items))
-    return jsonify(processed=len(items))
+    # Sending happens in the dispatch-reminders process, not this request.
+    request_run(uid)
+    logger.info("Queued due reminders run user=%s", uid)
+    return jsonify(queued=True), 202
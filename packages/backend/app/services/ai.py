@@ -1,25 +1,16 @@
-from sqlalchemy import extract, func
+from sqlalchemy import func
 from ..extensions import db
-from ..models import Expense
-from ..config import Settings
-
-try:
-    from openai import OpenAI
-except Exception:  # pragma: no cover
-    OpenAI = None
-
-
-_settings = Settings()
+from ..models import MonthlyRollup
+from . import http_clients
+from .queries import month_range
 
 
 def _heuristic_budget(uid: int, ym: str):
-    year, month = map(int, ym.split("-"))
     total = (
-        db.session.query(func.coalesce(func.sum(Expense.amount), 0))
+        db.session.query(func.coalesce(func.sum(MonthlyRollup.total_amount), 0))
         .filter(
-            Expense.user_id == uid,
-            extract("year", Expense.spent_at) == year,
-            extract("month", Expense.spent_at) == month,
+            MonthlyRollup.user_id == uid,
+            MonthlyRollup.month == month_range(ym)[0],
         )
         .scalar()
     )
@@ -37,19 +28,27 @@ def _heuristic_budget(uid: int, ym: str):
     }
 
 
+def is_fallback_suggestion(suggestion: dict) -> bool:
+    """True for a heuristic answer given because the OpenAI call failed."""
+    return (
+        suggestion.get("method") == "heuristic"
+        and http_clients.openai_client() is not None
+    )
+
+
 def monthly_budget_suggestion(uid: int, ym: str):
-    if _settings.openai_api_key and OpenAI:
+    client = http_clients.openai_client()
+    if client:
         try:
-            client = OpenAI(api_key=_settings.openai_api_key)
-            year, month = map(int, ym.split("-"))
             rows = (
-                db.session.query(Expense.category_id, func.sum(Expense.amount))
+                db.session.query(
+                    MonthlyRollup.category_id, func.sum(MonthlyRollup.total_amount)
+                )
                 .filter(
-                    Expense.user_id == uid,
-                    extract("year", Expense.spent_at) == year,
-                    extract("month", Expense.spent_at) == month,
+                    MonthlyRollup.user_id == uid,
+                    MonthlyRollup.month == month_range(ym)[0],
                 )
-                .group_by(Expense.category_id)
+                .group_by(MonthlyRollup.category_id)
                 .all()
             )
             categories = {str(k or "uncat"): float(v) for k, v in rows}
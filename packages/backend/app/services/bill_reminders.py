@@ -0,0 +1,117 @@
+import logging
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import select, true, tuple_
+
+from ..config import Settings
+from ..extensions import db
+from ..models import Bill, Reminder
+from . import metrics
+from .queries import dialect_insert
+
+logger = logging.getLogger("finmind.bill_reminders")
+
+_settings = Settings()
+
+
+def reminder_send_at(due: date) -> datetime:
+    """When the reminder for a bill due on ``due`` goes out.
+
+    Derived only from the due date so regenerating it is idempotent; a time
+    already in the past is simply picked up by the next dispatcher run.
+    """
+    send_on = due - timedelta(days=_settings.bill_reminder_lead_days)
+    return datetime.combine(send_on, time(hour=_settings.bill_reminder_hour_utc))
+
+
+def reminder_message(name: str, amount, currency: str, due: date) -> str:
+    return f"Reminder: {name} ({amount:.2f} {currency}) is due on {due.isoformat()}"
+
+
+def generate_due(
+    today: date | None = None,
+    lookahead_days: int | None = None,
+    batch_size: int | None = None,
+) -> int:
+    """Create reminders for every active bill due within the lookahead window.
+
+    Bills are read in keyset-paged batches of plain rows over
+    ``idx_bills_active_due`` and each batch is inserted with ON CONFLICT DO
+    NOTHING against ``uq_reminders_bill_send_channel``, so re-running is a no-op.
+    Returns the number of reminders created.
+    """
+    today = today or datetime.utcnow().date()
+    horizon = today + timedelta(
+        days=(
+            _settings.bill_reminder_lookahead_days
+            if lookahead_days is None
+            else lookahead_days
+        )
+    )
+    batch_size = batch_size or _settings.bill_reminder_batch_size
+    q = (
+        select(
+            Bill.id,
+            Bill.user_id,
+            Bill.name,
+            Bill.amount,
+            Bill.currency,
+            Bill.next_due_date,
+        )
+        # "= true" rather than "IS TRUE" so Postgres can seek the index.
+        .where(
+            Bill.active == true(),
+            Bill.next_due_date >= today,
+            Bill.next_due_date <= horizon,
+            Bill.channel_email == true(),
+        )
+        .order_by(Bill.next_due_date, Bill.id)
+        .limit(batch_size)
+    )
+    created = 0
+    after = None
+    while True:
+        page = q
+        if after is not None:
+            page = q.where(tuple_(Bill.next_due_date, Bill.id) > tuple_(*after))
+        try:
+            rows = db.session.execute(page).all()
+            if rows:
+                created += _insert_reminders(rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        if len(rows) < batch_size:
+            break
+        after = (rows[-1].next_due_date, rows[-1].id)
+    metrics.incr("reminders.generated", created)
+    logger.info(
+        "Generated bill reminders count=%s window=%s..%s", created, today, horizon
+    )
+    return created
+
+
+def _insert_reminders(rows) -> int:
+    # WhatsApp reminders need a phone number, which users don't have yet;
+    # channel_whatsapp bills still get their email reminder. The address is
+    # looked up when the reminder is sent, so it follows email changes.
+    values = [
+        {
+            "user_id": r.user_id,
+            "bill_id": r.id,
+            "message": reminder_message(r.name, r.amount, r.currency, r.next_due_date),
+            "send_at": reminder_send_at(r.next_due_date),
+            "sent": False,
+            "channel": "email",
+        }
+        for r in rows
+    ]
+    stmt = (
+        dialect_insert(Reminder)
+        .values(values)
+        .on_conflict_do_nothing(
+            index_elements=[Reminder.bill_id, Reminder.send_at, Reminder.channel]
+        )
+    )
+    return max(db.session.execute(stmt).rowcount, 0)
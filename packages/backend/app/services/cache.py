@@ -1,6 +1,11 @@
-import json
-from typing import Iterable
-from ..extensions import redis_client
+import time
+from typing import Any, Callable, Iterable
+
+from redis.exceptions import LockError
+
+from .. import json_provider
+from ..extensions import redis_binary_client, redis_client
+from . import metrics
 
 
 def monthly_summary_key(user_id: int, ym: str) -> str:
@@ -19,21 +24,34 @@ def insights_key(user_id: int, ym: str) -> str:
     return f"insights:{user_id}:{ym}"
 
 
+def forecast_key(user_id: int, day: str) -> str:
+    # Under insights:{uid}:* so expense and category writes clear it too.
+    return f"insights:{user_id}:forecast:{day}"
+
+
 def dashboard_summary_key(user_id: int, ym: str) -> str:
     return f"user:{user_id}:dashboard_summary:{ym}"
 
 
 def cache_set(key: str, value, ttl_seconds: int | None = None):
-    payload = json.dumps(value)
+    cache_set_raw(key, json_provider.dumps(value), ttl_seconds)
+
+
+def cache_get(key: str):
+    raw = cache_get_raw(key)
+    return json_provider.loads(raw) if raw else None
+
+
+def cache_set_raw(key: str, body: bytes, ttl_seconds: int | None = None):
+    """Store already-encoded bytes, e.g. a JSON response body."""
     if ttl_seconds:
-        redis_client.setex(key, ttl_seconds, payload)
+        redis_binary_client.setex(key, ttl_seconds, body)
     else:
-        redis_client.set(key, payload)
+        redis_binary_client.set(key, body)
 
 
-def cache_get(key: str):
-    raw = redis_client.get(key)
-    return json.loads(raw) if raw else None
+def cache_get_raw(key: str) -> bytes | None:
+    return redis_binary_client.get(key)
 
 
 def cache_delete_patterns(patterns: Iterable[str]):
@@ -45,3 +63,62 @@ def cache_delete_patterns(patterns: Iterable[str]):
                 redis_client.delete(*keys)
             if cursor == 0:
                 break
+
+
+def cache_get_or_compute(
+    key: str,
+    compute: Callable[[], Any],
+    ttl_seconds: int,
+    *,
+    metric: str | None = None,
+    lock_seconds: int = 60,
+    wait_seconds: float = 30.0,
+    poll_seconds: float = 0.05,
+    cache_if: Callable[[Any], bool] | None = None,
+):
+    """Read-through cache where concurrent misses for one key compute once.
+
+    The first miss takes ``lock:<key>`` and computes. Other callers poll the
+    key until it is filled; if the holder gives up without filling it, or the
+    wait runs out, they compute themselves. Values rejected by ``cache_if``
+    are returned without being stored.
+    """
+    cached = cache_get(key)
+    if cached is not None:
+        _count(metric, "hits")
+        return cached
+    lock = redis_client.lock(f"lock:{key}", timeout=lock_seconds)
+    if not lock.acquire(blocking=False):
+        deadline = time.monotonic() + wait_seconds
+        while time.monotonic() < deadline:
+            time.sleep(poll_seconds)
+            cached = cache_get(key)
+            if cached is not None:
+                _count(metric, "coalesced")
+                return cached
+            if lock.acquire(blocking=False):
+                break
+        else:
+            _count(metric, "misses")
+            return compute()
+    try:
+        # The previous holder may have filled the key just before releasing.
+        cached = cache_get(key)
+        if cached is not None:
+            _count(metric, "coalesced")
+            return cached
+        _count(metric, "misses")
+        value = compute()
+        if cache_if is None or cache_if(value):
+            cache_set(key, value, ttl_seconds=ttl_seconds)
+        return value
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            pass  # expired while computing; another caller may hold it now
+
+
+def _count(metric: str | None, outcome: str):
+    if metric:
+        metrics.incr(f"{metric}.{outcome}")
@@ -1,12 +1,30 @@
+import codecs
 import csv
+import hashlib
 import io
 import json
+import logging
+import multiprocessing
+import os
 import re
+import signal
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
 from decimal import Decimal, InvalidOperation
-from typing import Any
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Iterable, Iterator
 
-import requests
+import redis
+
+from sqlalchemy import insert
+
+from ..config import Settings
+from ..extensions import db, redis_binary_client
+from ..models import Expense
+from . import http_clients, metrics, rollups
 
 try:
     from pypdf import PdfReader
@@ -15,87 +33,406 @@ except Exception:  # pragma: no cover
 
 
 DEFAULT_GEMINI_MODEL = "gemini-1.5-flash"
+# Part of the extraction cache key; bump when PDF parsing output changes.
+PARSER_VERSION = "3"
+IMPORT_BATCH_SIZE = 1000
+IMPORT_INSERT_CHUNK_SIZE = 1000
+CSV_READ_CHUNK_SIZE = 64 * 1024
+# Extra time allowed for worker processes to start and load the PDF.
+PDF_POOL_STARTUP_SECONDS = 30.0
+
+_settings = Settings()
+logger = logging.getLogger("finmind.expense_import")
 
 
 def extract_transactions_from_statement(
     *,
     filename: str,
     content_type: str | None,
-    data: bytes,
+    data: bytes | BinaryIO,
     gemini_api_key: str | None,
     gemini_model: str = DEFAULT_GEMINI_MODEL,
-) -> list[dict[str, Any]]:
+) -> Iterable[dict[str, Any]]:
+    """Raw statement rows; CSV uploads are parsed lazily from ``data``."""
     name = (filename or "").lower()
     ctype = (content_type or "").lower()
+    stream = io.BytesIO(data) if isinstance(data, (bytes, bytearray)) else data
     if name.endswith(".csv") or "csv" in ctype:
-        return _parse_csv_rows(data)
+        return _iter_csv_rows(stream)
     if name.endswith(".pdf") or "pdf" in ctype:
-        text = _extract_pdf_text(data)
-        if gemini_api_key:
-            try:
-                ai_rows = _extract_with_gemini(text, gemini_api_key, gemini_model)
-                if normalize_import_rows(ai_rows):
-                    return ai_rows
-            except Exception:
-                pass
-        return _extract_pdf_rows_fallback(text)
+        return _extract_pdf_rows(stream.read(), gemini_api_key, gemini_model)
     raise ValueError("Only PDF and CSV files are supported")
 
 
-def normalize_import_rows(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    normalized: list[dict[str, Any]] = []
+def _extract_pdf_rows(
+    data: bytes, gemini_api_key: str | None, gemini_model: str
+) -> list[dict[str, Any]]:
+    # Re-uploads of the same statement skip pypdf and the paid Gemini call.
+    cache_key = _extract_cache_key(data, gemini_model if gemini_api_key else None)
+    cached = _extract_cache_get(cache_key)
+    if cached is not None:
+        metrics.incr("import_extract_cache.hits")
+        metrics.incr("import_extract_cache.bytes_saved", len(data))
+        return cached
+    metrics.incr("import_extract_cache.misses")
+    text = _extract_pdf_text(data)
+    if gemini_api_key:
+        try:
+            ai_rows = _extract_with_gemini(text, gemini_api_key, gemini_model)
+            if normalize_import_rows(ai_rows):
+                _extract_cache_set(cache_key, ai_rows)
+                return ai_rows
+        except Exception:
+            pass
+        # Don't pin a degraded result when Gemini was expected to answer.
+        return _extract_pdf_rows_fallback(text)
+    rows = _extract_pdf_rows_fallback(text)
+    _extract_cache_set(cache_key, rows)
+    return rows
+
+
+def _extract_cache_key(data: bytes, model: str | None) -> str:
+    digest = hashlib.sha256(data).hexdigest()
+    return f"import_extract:{digest}:{PARSER_VERSION}:{model or 'fallback'}"
+
+
+def _extract_cache_get(key: str) -> list[dict[str, Any]] | None:
+    try:
+        raw = redis_binary_client.get(key)
+    except redis.RedisError:
+        logger.warning("Extraction cache read failed", exc_info=True)
+        return None
+    if not raw:
+        return None
+    # One tag byte: "z" for zlib-compressed JSON, "j" for plain JSON.
+    payload = zlib.decompress(raw[1:]) if raw[:1] == b"z" else raw[1:]
+    return json.loads(payload)
+
+
+def _extract_cache_set(key: str, rows: list[dict[str, Any]]) -> None:
+    payload = json.dumps(rows, separators=(",", ":")).encode("utf-8")
+    if len(payload) >= _settings.extract_cache_compress_min_bytes:
+        payload = b"z" + zlib.compress(payload)
+    else:
+        payload = b"j" + payload
+    if len(payload) > _settings.extract_cache_max_bytes:
+        metrics.incr("import_extract_cache.oversize")
+        return
+    try:
+        redis_binary_client.setex(key, _settings.extract_cache_ttl_seconds, payload)
+    except redis.RedisError:
+        logger.warning("Extraction cache write failed", exc_info=True)
+
+
+def preview_statement(
+    uid: int,
+    *,
+    filename: str,
+    content_type: str | None,
+    data: bytes | BinaryIO,
+    gemini_api_key: str | None,
+    gemini_model: str = DEFAULT_GEMINI_MODEL,
+    on_progress: Callable[[int], None] | None = None,
+) -> dict[str, Any]:
+    """Parse, normalize and flag duplicates for a statement upload."""
+    rows = extract_transactions_from_statement(
+        filename=filename,
+        content_type=content_type,
+        data=data,
+        gemini_api_key=gemini_api_key,
+        gemini_model=gemini_model,
+    )
+    transactions: list[dict[str, Any]] = []
+    duplicates = 0
+    for batch in iter_batches(iter_normalized_rows(rows)):
+        existing = _existing_import_keys(uid, batch)
+        duplicates += sum(1 for t in batch if _import_key(t) in existing)
+        transactions.extend(batch)
+        if on_progress:
+            on_progress(len(transactions))
+    return {
+        "total": len(transactions),
+        "duplicates": duplicates,
+        "transactions": transactions,
+    }
+
+
+def commit_transactions(
+    uid: int, rows: Iterable[dict[str, Any]]
+) -> tuple[int, int, set[str]]:
+    """Insert non-duplicate rows in the caller's transaction.
+
+    Returns (inserted, duplicates, touched YYYY-MM months).
+    """
+    inserted = 0
+    duplicates = 0
+    touched_months: set[str] = set()
+    created_at = datetime.utcnow()
+    deltas = rollups.RollupDeltas()
+    for batch in iter_batches(iter_normalized_rows(rows)):
+        # Earlier batches are already inserted in this transaction, so the
+        # per-batch lookup also catches repeats across batch boundaries.
+        existing = _existing_import_keys(uid, batch)
+        values: list[dict[str, Any]] = []
+        for t in batch:
+            key = _import_key(t)
+            if key is None:
+                continue
+            if key in existing:
+                duplicates += 1
+                continue
+            existing.add(key)
+            spent_at, amount, notes = key
+            expense_type = str(t.get("expense_type") or "EXPENSE").upper()
+            values.append(
+                {
+                    "user_id": uid,
+                    "amount": amount,
+                    "currency": t.get("currency", "USD"),
+                    "expense_type": expense_type,
+                    "category_id": t.get("category_id"),
+                    "notes": notes,
+                    "spent_at": spent_at,
+                    "created_at": created_at,
+                }
+            )
+            deltas.add(uid, spent_at, t.get("category_id"), expense_type, amount)
+            touched_months.add(t["date"][:7])
+        inserted += _bulk_insert_expenses(values)
+    rollups.apply_deltas(deltas)
+    return inserted, duplicates, touched_months
+
+
+def normalize_import_rows(rows: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    return list(iter_normalized_rows(rows))
+
+
+def iter_normalized_rows(
+    rows: Iterable[dict[str, Any]],
+) -> Iterator[dict[str, Any]]:
+    normalizer = ImportNormalizer()
     for row in rows:
-        dt = _normalize_date(row.get("date"))
-        amt = _normalize_amount(row.get("amount"))
+        dt = normalizer.date(row.get("date"))
+        amt = normalizer.amount(row.get("amount"))
         desc = str(row.get("description") or "").strip()
         if not dt or amt is None or not desc:
             continue
         expense_type = _infer_expense_type(row.get("expense_type"), desc, amt)
         cid = row.get("category_id")
         category_id = int(cid) if cid not in (None, "", "null") else None
-        normalized.append(
-            {
-                "date": dt,
-                "amount": float(abs(amt)),
-                "description": desc[:500],
-                "category_id": category_id,
-                "expense_type": expense_type,
-                "currency": str(row.get("currency") or "USD")[:10],
-            }
+        yield {
+            "date": dt,
+            "amount": float(abs(amt)),
+            "description": desc[:500],
+            "category_id": category_id,
+            "expense_type": expense_type,
+            "currency": str(row.get("currency") or "USD")[:10],
+        }
+
+
+def iter_batches(
+    items: Iterable[dict[str, Any]], size: int | None = None
+) -> Iterator[list[dict[str, Any]]]:
+    size = size or IMPORT_BATCH_SIZE
+    it = iter(items)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+ImportKey = tuple[date, Decimal, str]
+
+
+def _import_key(row: dict[str, Any]) -> ImportKey | None:
+    try:
+        amount = Decimal(str(row["amount"])).quantize(Decimal("0.01"))
+    except (InvalidOperation, ValueError, TypeError):
+        return None
+    return date.fromisoformat(row["date"]), amount, row["description"]
+
+
+def _existing_import_keys(uid: int, rows: list[dict[str, Any]]) -> set[ImportKey]:
+    # One range query over the batch's dates instead of a lookup per row.
+    if not rows:
+        return set()
+    dates = [date.fromisoformat(r["date"]) for r in rows]
+    existing = (
+        db.session.query(Expense.spent_at, Expense.amount, Expense.notes)
+        .filter(
+            Expense.user_id == uid,
+            Expense.spent_at >= min(dates),
+            Expense.spent_at <= max(dates),
         )
-    return normalized
+        .all()
+    )
+    return {
+        (spent_at, Decimal(str(amount)).quantize(Decimal("0.01")), notes)
+        for spent_at, amount, notes in existing
+    }
+
 
+def _bulk_insert_expenses(values: list[dict[str, Any]]) -> int:
+    # Multi-row INSERT ... VALUES in chunks rather than one ORM flush per row.
+    for start in range(0, len(values), IMPORT_INSERT_CHUNK_SIZE):
+        chunk = values[start : start + IMPORT_INSERT_CHUNK_SIZE]
+        db.session.execute(insert(Expense).values(chunk))
+    return len(values)
 
-def _parse_csv_rows(data: bytes) -> list[dict[str, Any]]:
-    text = data.decode("utf-8-sig", errors="ignore")
-    reader = csv.DictReader(io.StringIO(text))
-    out: list[dict[str, Any]] = []
+
+def _iter_csv_rows(stream: BinaryIO) -> Iterator[dict[str, Any]]:
+    reader = csv.DictReader(_iter_text_lines(stream))
     for row in reader:
-        out.append(
-            {
-                "date": row.get("date") or row.get("spent_at"),
-                "amount": row.get("amount"),
-                "description": row.get("description") or row.get("notes"),
-                "category_id": row.get("category_id"),
-                "currency": row.get("currency") or "USD",
-            }
-        )
-    return out
+        yield {
+            "date": row.get("date") or row.get("spent_at"),
+            "amount": row.get("amount"),
+            "description": row.get("description") or row.get("notes"),
+            "category_id": row.get("category_id"),
+            "currency": row.get("currency") or "USD",
+        }
+
+
+def _iter_text_lines(
+    stream: BinaryIO, chunk_size: int = CSV_READ_CHUNK_SIZE
+) -> Iterator[str]:
+    # Decode incrementally so a multi-byte character or BOM split across
+    # chunks is handled, and only one chunk plus a partial line is held.
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="ignore")
+    pending = ""
+    while True:
+        chunk = stream.read(chunk_size)
+        text = decoder.decode(chunk or b"", final=not chunk)
+        if "\n" in text:
+            lines = text.split("\n")
+            lines[0] = pending + lines[0]
+            pending = lines.pop()
+            for line in lines:
+                yield line + "\n"
+        else:
+            pending += text
+        if not chunk:
+            break
+    if pending:
+        yield pending
 
 
 def _extract_pdf_text(data: bytes) -> str:
     if not PdfReader:
         raise ValueError("PDF extraction dependency missing (pypdf)")
     reader = PdfReader(io.BytesIO(data))
-    pages: list[str] = []
-    for page in reader.pages:
-        pages.append(page.extract_text() or "")
-    text = "\n".join(pages).strip()
+    page_count = len(reader.pages)
+    workers = min(_pdf_workers(), page_count)
+    timeout = _settings.pdf_page_timeout_seconds
+    if workers > 1 and page_count >= _settings.pdf_parallel_min_pages:
+        pages = _extract_pages_pool(data, page_count, workers)
+    elif _can_alarm():
+        pages = [_extract_page(reader, i, timeout) for i in range(page_count)]
+    else:
+        # Page alarms only work on the main thread; off it (request threads),
+        # a single worker process enforces the timeouts instead.
+        pages = _extract_pages_pool(data, page_count, 1)
+    # Form feeds keep page boundaries for chunking; splitlines() treats them
+    # as line breaks.
+    text = "\f".join(pages).strip()
     if not text:
         raise ValueError("PDF has no readable text")
     return text
 
 
+def _pdf_workers() -> int:
+    # Worker processes only pay off with more than one CPU to run them on.
+    cpus = os.cpu_count() or 1
+    if cpus < 2:
+        return 1
+    return _settings.pdf_extract_workers or cpus
+
+
+def _can_alarm() -> bool:
+    return (
+        hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+
+
+def _pdf_mp_context():
+    # Forking a threaded web worker is unsafe. The fork server imports this
+    # module once, so starting a pool per statement stays cheap; spawn is the
+    # portable fallback.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload([__name__])
+        return ctx
+    return multiprocessing.get_context("spawn")
+
+
+def _extract_pages_pool(data: bytes, page_count: int, workers: int) -> list[str]:
+    """Extract page text in worker processes, preserving page order.
+
+    Each worker parses the PDF once and then handles contiguous page slices.
+    Pages still unfinished when the overall deadline passes come back empty.
+    """
+    timeout = _settings.pdf_page_timeout_seconds
+    step = max(1, -(-page_count // (workers * 4)))
+    pages = [""] * page_count
+    # Worst case is every page of a worker's share running into its timeout.
+    deadline = (
+        time.monotonic()
+        + PDF_POOL_STARTUP_SECONDS
+        + timeout * -(-page_count // workers)
+    )
+    # Leaving the block terminates the workers, including one stuck outside
+    # Python code where its page alarm can't reach it.
+    with _pdf_mp_context().Pool(
+        workers, initializer=_init_pdf_worker, initargs=(data,)
+    ) as pool:
+        results = [
+            (start, pool.apply_async(_extract_page_slice, (start, stop, timeout)))
+            for start, stop in (
+                (s, min(s + step, page_count)) for s in range(0, page_count, step)
+            )
+        ]
+        for start, result in results:
+            try:
+                texts = result.get(timeout=max(0.0, deadline - time.monotonic()))
+            except multiprocessing.TimeoutError:
+                continue
+            pages[start : start + len(texts)] = texts
+    return pages
+
+
+class _PageTimeout(Exception):
+    pass
+
+
+def _raise_page_timeout(signum, frame):
+    raise _PageTimeout()
+
+
+_worker_reader = None
+
+
+def _init_pdf_worker(data: bytes) -> None:
+    global _worker_reader
+    _worker_reader = PdfReader(io.BytesIO(data))
+
+
+def _extract_page_slice(start: int, stop: int, timeout: float) -> list[str]:
+    return [_extract_page(_worker_reader, i, timeout) for i in range(start, stop)]
+
+
+def _extract_page(reader, index: int, timeout: float | None = None) -> str:
+    # SIGALRM only works on the main thread, which is where pool workers run.
+    if not timeout or not _can_alarm():
+        return reader.pages[index].extract_text() or ""
+    previous = signal.signal(signal.SIGALRM, _raise_page_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return reader.pages[index].extract_text() or ""
+    except _PageTimeout:
+        return ""
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
 def _extract_with_gemini(
     text: str,
     api_key: str | None,
@@ -103,6 +440,95 @@ def _extract_with_gemini(
 ) -> list[dict[str, Any]]:
     if not api_key:
         raise ValueError("GEMINI_API_KEY is not configured")
+    chunks = _chunk_statement(
+        text, _settings.gemini_chunk_chars, _settings.gemini_chunk_overlap_lines
+    )
+    if len(chunks) == 1:
+        return _gemini_chunk_rows(chunks[0][0], api_key, model)
+    workers = max(1, min(_settings.gemini_max_concurrency, len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(
+            pool.map(lambda c: _gemini_chunk_rows(c[0], api_key, model), chunks)
+        )
+    rows: list[dict[str, Any]] = list(results[0])
+    for (_chunk, overlap), chunk_rows, previous in zip(
+        chunks[1:], results[1:], results
+    ):
+        rows.extend(_drop_seam_duplicates(chunk_rows, previous, overlap))
+    return rows
+
+
+def _chunk_statement(
+    text: str, max_chars: int, overlap_lines: int
+) -> list[tuple[str, str]]:
+    """Split statement text into (chunk, overlap) pairs of about max_chars.
+
+    Chunks break between pages where possible, otherwise between lines. Each
+    chunk after the first repeats the previous chunk's last ``overlap_lines``
+    lines (returned as ``overlap``) so a transaction spanning the break is seen
+    whole at least once.
+    """
+    units: list[str] = []
+    for page in text.split("\f"):
+        if len(page) <= max_chars:
+            units.append(page)
+            continue
+        lines = page.split("\n")
+        for i, line in enumerate(lines):
+            units.append(line + ("\n" if i < len(lines) - 1 else ""))
+    chunks: list[str] = []
+    current = ""
+    for unit in units:
+        sep = "" if not current or current.endswith("\n") else "\n"
+        if current and len(current) + len(sep) + len(unit) > max_chars:
+            chunks.append(current)
+            current = unit
+        else:
+            current += sep + unit
+    if current or not chunks:
+        chunks.append(current)
+
+    out = [(chunks[0], "")]
+    for previous, chunk in zip(chunks, chunks[1:]):
+        tail = (
+            previous.rstrip("\n").split("\n")[-overlap_lines:] if overlap_lines else []
+        )
+        overlap = "\n".join(tail)
+        out.append((f"{overlap}\n{chunk}" if overlap else chunk, overlap))
+    return out
+
+
+def _drop_seam_duplicates(
+    rows: list[dict[str, Any]], previous: list[dict[str, Any]], overlap: str
+) -> list[dict[str, Any]]:
+    # Only rows from the repeated overlap lines can be double counted; other
+    # identical rows are genuine repeat transactions.
+    seen: dict[tuple, int] = {}
+    for row in previous:
+        key = _seam_key(row)
+        seen[key] = seen.get(key, 0) + 1
+    overlap_lower = overlap.lower()
+    kept = []
+    for row in rows:
+        key = _seam_key(row)
+        if seen.get(key) and key[2] and key[2] in overlap_lower:
+            seen[key] -= 1
+            continue
+        kept.append(row)
+    return kept
+
+
+def _seam_key(row: dict[str, Any]) -> tuple:
+    if not isinstance(row, dict):
+        return (None, None, "")
+    return (
+        _normalize_date(row.get("date")),
+        _normalize_amount(row.get("amount")),
+        str(row.get("description") or "").strip().lower(),
+    )
+
+
+def _gemini_chunk_rows(text: str, api_key: str, model: str) -> list[dict[str, Any]]:
     prompt = (
         "You are FinMind's data-extraction persona: "
         "a meticulous bank statement analyst. "
@@ -111,20 +537,17 @@ def _extract_with_gemini(
         "description(string), category_id(null), currency('USD'). "
         "Ignore balances, totals, and non-transaction rows. "
         "Do not include markdown.\n\n"
-        f"STATEMENT_TEXT:\n{text[:120000]}"
+        f"STATEMENT_TEXT:\n{text}"
     )
-    url = (
-        "https://generativelanguage.googleapis.com/v1beta/models/"
-        f"{model}:generateContent"
-    )
-    resp = requests.post(
+    url = f"{_settings.gemini_base_url.rstrip('/')}/models/{model}:generateContent"
+    resp = http_clients.session().post(
         url,
         params={"key": api_key},
         json={
             "generationConfig": {"temperature": 0},
             "contents": [{"parts": [{"text": prompt}]}],
         },
-        timeout=45,
+        timeout=http_clients.timeout(),
     )
     resp.raise_for_status()
     payload = resp.json()
@@ -157,11 +580,17 @@ def _parse_transactions_json(text: str) -> list[dict[str, Any]]:
     return parsed
 
 
+_DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y", "%m-%d-%Y", "%d-%m-%Y")
+# Earlier formats that can also parse a string the keyed format accepts
+# (05/03/2026 is valid month-first and day-first). They must keep priority.
+_SHADOWING_FORMATS = {2: (1,), 4: (3,)}
+
+
 def _normalize_date(value: Any) -> str | None:
     if value in (None, ""):
         return None
     raw = str(value).strip()
-    for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y", "%m-%d-%Y", "%d-%m-%Y"):
+    for fmt in _DATE_FORMATS:
         try:
             return datetime.strptime(raw, fmt).date().isoformat()
         except ValueError:
@@ -187,84 +616,193 @@ def _normalize_amount(value: Any) -> Decimal | None:
         return None
 
 
-def _infer_expense_type(raw_type: Any, description: str, amount: Decimal) -> str:
+class ImportNormalizer:
+    """Date and amount normalization for the rows of one import.
+
+    Statements use one date format and amount convention throughout. The
+    normalizer remembers the date format that last matched and the symbols
+    stripped from amounts, tries those first, and memoizes repeated raw
+    strings. Results are identical to _normalize_date and _normalize_amount.
+    """
+
+    memo_size = 4096
+
+    def __init__(self):
+        self._date_order: tuple[int, ...] | None = None
+        self._amount_symbols: set[str] = set()
+        self._amount_table: dict[int, None] = {}
+        self._dates: dict[str, str | None] = {}
+        self._amounts: dict[str, Decimal | None] = {}
+
+    def date(self, value: Any) -> str | None:
+        if value in (None, ""):
+            return None
+        raw = str(value).strip()
+        if raw in self._dates:
+            return self._dates[raw]
+        out = None
+        if self._date_order:
+            out = self._strptime(raw, self._date_order)
+        if out is None:
+            out = _normalize_date(raw)
+            if out is not None:
+                self._learn_date_format(raw)
+        if len(self._dates) < self.memo_size:
+            self._dates[raw] = out
+        return out
+
+    def amount(self, value: Any) -> Decimal | None:
+        if value in (None, ""):
+            return None
+        raw = str(value).strip()
+        if raw in self._amounts:
+            return self._amounts[raw]
+        cleaned = raw.translate(self._amount_table)
+        if not _PLAIN_AMOUNT_RE.fullmatch(cleaned):
+            cleaned = re.sub(r"[^\d\.\-]", "", raw)
+            self._learn_amount_symbols(raw, cleaned)
+        out = None
+        if cleaned:
+            try:
+                out = Decimal(cleaned).quantize(_CENTS)
+                if raw.startswith("(") and raw.endswith(")"):
+                    out = -abs(out)
+            except (InvalidOperation, ValueError):
+                out = None
+        if len(self._amounts) < self.memo_size:
+            self._amounts[raw] = out
+        return out
+
+    @staticmethod
+    def _strptime(raw: str, order: tuple[int, ...]) -> str | None:
+        for i in order:
+            try:
+                return datetime.strptime(raw, _DATE_FORMATS[i]).date().isoformat()
+            except ValueError:
+                continue
+        return None
+
+    def _learn_date_format(self, raw: str) -> None:
+        for i, fmt in enumerate(_DATE_FORMATS):
+            try:
+                datetime.strptime(raw, fmt)
+            except ValueError:
+                continue
+            self._date_order = _SHADOWING_FORMATS.get(i, ()) + (i,)
+            return
+
+    def _learn_amount_symbols(self, raw: str, cleaned: str) -> None:
+        # Only characters the regex strips are safe to translate away.
+        removed = set(raw) - set(cleaned)
+        if not removed <= self._amount_symbols:
+            self._amount_symbols |= removed
+            self._amount_table = str.maketrans("", "", "".join(self._amount_symbols))
+
+
+_INCOME_KEYWORDS_RE = re.compile("SALARY|PAYROLL|REFUND|INTEREST|DIVIDEND|CREDIT")
+
+
+def _infer_expense_type(
+    raw_type: Any, description: str, amount: Decimal | float
+) -> str:
     t = str(raw_type or "").strip().upper()
     if t in {"INCOME", "EXPENSE"}:
         return t
     if amount < 0:
         return "EXPENSE"
-    income_keywords = (
-        "SALARY",
-        "PAYROLL",
-        "REFUND",
-        "INTEREST",
-        "DIVIDEND",
-        "CREDIT",
-    )
-    if any(k in description.upper() for k in income_keywords):
+    if _INCOME_KEYWORDS_RE.search(description.upper()):
         return "INCOME"
     return "EXPENSE"
 
 
+# One match classifies a whitespace-collapsed statement line: an ISO date, or
+# a two-digit pair plus four-digit year separated by "/" or "-". Lines dated
+# with two-digit years are rejected, as _normalize_date cannot parse them.
+_PDF_LINE_RE = re.compile(
+    r"(?P<date>(?P<iso_y>\d{4})-(?P<iso_m>[0-9]{2})-(?P<iso_d>[0-9]{2})"
+    r"|(?P<a>[0-9]{2})(?P<sep>[/-])(?P<b>[0-9]{2})(?P=sep)(?P<y>\d{4}))"
+    r" (?P<rest>.+)"
+)
+_PDF_AMOUNT_RE = re.compile(r"(?<!\w)\(?-?\$?\d[\d,]*(?:\.\d{2})?\)?(?!\w)")
+_AMOUNT_SYMBOLS = str.maketrans("", "", "($,)")
+_CENTS = Decimal("0.01")
+_PLAIN_AMOUNT_RE = re.compile(r"[0-9.\-]+")
+
+
 def _extract_pdf_rows_fallback(text: str) -> list[dict[str, Any]]:
-    rows: list[dict[str, Any]] = []
-    seen: set[tuple[str, str, str]] = set()
+    lines = []
+    # Positive votes mean the statement writes day/month, negative month/day.
+    day_first_votes = 0
     for raw_line in text.splitlines():
-        line = re.sub(r"\s+", " ", raw_line).strip()
-        if not line:
+        m = _PDF_LINE_RE.match(" ".join(raw_line.split()))
+        if m is None:
             continue
-        parsed = _parse_pdf_line(line)
-        if not parsed:
+        parts = m.groups()
+        lines.append(parts)
+        if parts[1] is None:
+            day_first_votes += (parts[4] > "12") - (parts[6] > "12")
+    day_first = day_first_votes > 0
+
+    rows: list[dict[str, Any]] = []
+    seen: set[tuple[str, float, str]] = set()
+    dates: dict[str, str | None] = {}
+    for date_text, iso_y, iso_m, iso_d, a, _sep, b, year, rest in lines:
+        if date_text in dates:
+            tx_date = dates[date_text]
+        elif iso_y is not None:
+            tx_date = dates[date_text] = _pdf_date(iso_y, iso_m, iso_d)
+        else:
+            month, day = (b, a) if day_first else (a, b)
+            # Fall back to the other order for lines that break the pattern.
+            tx_date = _pdf_date(year, month, day) or _pdf_date(year, day, month)
+            dates[date_text] = tx_date
+        if not tx_date:
             continue
-        key = (
-            str(parsed.get("date")),
-            str(parsed.get("amount")),
-            str(parsed.get("description")),
-        )
+
+        # Amounts never contain spaces, so a final token that is an amount is
+        # also the last match finditer would report.
+        amount_match = _PDF_AMOUNT_RE.fullmatch(rest, rest.rfind(" ") + 1)
+        if amount_match is None:
+            for amount_match in _PDF_AMOUNT_RE.finditer(rest):
+                pass
+            if amount_match is None:
+                continue
+        token = amount_match.group()
+        cleaned = token.translate(_AMOUNT_SYMBOLS)
+        if len(cleaned) <= 20:
+            # Two decimals at most, so quantize() would not change the value.
+            amount = float(cleaned)
+        else:
+            try:
+                amount = Decimal(cleaned).quantize(_CENTS)
+            except InvalidOperation:
+                continue
+        if token[0] == "(" and token[-1] == ")":
+            amount = -abs(amount)
+
+        description = rest[: amount_match.start()].strip(" -\t")
+        if len(description) < 2:
+            continue
+        value = float(abs(amount))
+        key = (tx_date, value, description)
         if key in seen:
             continue
         seen.add(key)
-        rows.append(parsed)
+        rows.append(
+            {
+                "date": tx_date,
+                "amount": value,
+                "description": description,
+                "category_id": None,
+                "expense_type": _infer_expense_type(None, description, amount),
+                "currency": "USD",
+            }
+        )
     return rows
 
 
-def _parse_pdf_line(line: str) -> dict[str, Any] | None:
-    date_patterns = (
-        r"^(\d{4}-\d{2}-\d{2})\s+(.+)$",
-        r"^(\d{2}/\d{2}/\d{4})\s+(.+)$",
-        r"^(\d{2}/\d{2}/\d{2})\s+(.+)$",
-        r"^(\d{2}-\d{2}-\d{4})\s+(.+)$",
-    )
-    rest: str | None = None
-    tx_date: str | None = None
-    for pattern in date_patterns:
-        m = re.match(pattern, line)
-        if m:
-            tx_date = _normalize_date(m.group(1))
-            rest = m.group(2).strip()
-            break
-    if not tx_date or not rest:
-        return None
-
-    amount_matches = list(
-        re.finditer(r"(?<!\w)\(?-?\$?\d[\d,]*(?:\.\d{2})?\)?(?!\w)", rest)
-    )
-    if not amount_matches:
-        return None
-    amount_match = amount_matches[-1]
-    amount = _normalize_amount(amount_match.group(0))
-    if amount is None:
-        return None
-
-    description = rest[: amount_match.start()].strip(" -\t")
-    if len(description) < 2:
+def _pdf_date(year: str, month: str, day: str) -> str | None:
+    try:
+        return date(int(year), int(month), int(day)).isoformat()
+    except ValueError:
         return None
-
-    return {
-        "date": tx_date,
-        "amount": float(abs(amount)),
-        "description": description,
-        "category_id": None,
-        "expense_type": _infer_expense_type(None, description, amount),
-        "currency": "USD",
-    }
@@ -0,0 +1,145 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from ..extensions import db
+from ..models import Bill
+from . import expense_snapshot, recurrence
+
+HORIZON_DAYS = 90
+ROLLING_WINDOWS = (7, 30)
+# Trailing window the projection's baseline level is taken from
+BASELINE_DAYS = 28
+# Month-of-year effects need a full year of history to mean anything
+MIN_DAYS_FOR_MONTH_EFFECT = 365
+
+_EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday; Monday is 0
+
+
+def daily_net_flow(uid: int, until: date) -> tuple[date, np.ndarray]:
+    """Income minus spending per day, dense from the first expense to ``until``.
+
+    Read from the user's columnar snapshot; the array covers ``[start, until)``
+    with zeros on days without activity.
+    """
+    snap = expense_snapshot.load(uid)
+    end = np.datetime64(until, "D").astype(np.int64)
+    before = snap.days < end
+    if not before.any():
+        return until, np.zeros(0)
+    days = snap.days[before].astype(np.int64)
+    first = days.min()
+    flow = np.bincount(
+        days - first, weights=snap.signed_cents()[before], minlength=int(end - first)
+    )
+    return np.datetime64(int(first), "D").item(), flow / 100.0
+
+
+def rolling_mean(flow: np.ndarray, window: int) -> np.ndarray:
+    """Trailing means over ``window`` days; shorter at the start of history."""
+    csum = np.concatenate(([0.0], np.cumsum(flow)))
+    idx = np.arange(1, flow.size + 1)
+    lower = np.maximum(idx - window, 0)
+    return (csum[idx] - csum[lower]) / (idx - lower)
+
+
+def _weekdays(days: np.ndarray) -> np.ndarray:
+    return (days.astype(np.int64) + _EPOCH_WEEKDAY) % 7
+
+
+def _months(days: np.ndarray) -> np.ndarray:
+    return days.astype("datetime64[M]").astype(np.int64) % 12
+
+
+def _group_effect(flow: np.ndarray, groups: np.ndarray, size: int) -> np.ndarray:
+    """Mean flow per group minus the overall mean; 0 for groups never seen."""
+    counts = np.bincount(groups, minlength=size)
+    sums = np.bincount(groups, weights=flow, minlength=size)
+    means = np.divide(sums, counts, out=np.zeros(size), where=counts > 0)
+    return np.where(counts > 0, means - flow.mean(), 0.0)
+
+
+def bill_outflows(uid: int, today: date, horizon: int) -> np.ndarray:
+    """Scheduled bill payments per day over the horizon.
+
+    An overdue bill counts one outstanding instalment today, however many
+    occurrences it has missed, then its occurrences from today onwards.
+    """
+    bills = (
+        db.session.query(Bill.amount, Bill.next_due_date, Bill.cadence, Bill.due_day)
+        .filter_by(user_id=uid, active=True)
+        .all()
+    )
+    positions, dates = recurrence.project(
+        [b.next_due_date for b in bills],
+        [b.cadence for b in bills],
+        [b.due_day for b in bills],
+        today + timedelta(days=horizon),
+        start=today,
+    )
+    amounts = np.array([float(b.amount) for b in bills], dtype=np.float64)
+    offsets = (dates - np.datetime64(today, "D")).astype(np.int64)
+    outflows = np.bincount(offsets, weights=amounts[positions], minlength=horizon)
+    overdue = np.array([b.next_due_date < today for b in bills], dtype=bool)
+    outflows[0] += amounts[overdue].sum()
+    return outflows
+
+
+def build_forecast(
+    start: date,
+    flow: np.ndarray,
+    bills: np.ndarray,
+    today: date,
+    horizon: int = HORIZON_DAYS,
+) -> dict:
+    """Project daily net flow and the running balance change over ``horizon``.
+
+    The level is the mean of the last ``BASELINE_DAYS``, adjusted by how each
+    weekday and calendar month historically differ from the overall mean;
+    scheduled bills are subtracted on their due dates.
+    """
+    history = np.datetime64(start, "D") + np.arange(flow.size)
+    ahead = np.datetime64(today, "D") + np.arange(horizon)
+    if flow.size:
+        baseline = flow[-BASELINE_DAYS:].mean()
+        weekday_effect = _group_effect(flow, _weekdays(history), 7)
+        month_effect = (
+            _group_effect(flow, _months(history), 12)
+            if flow.size >= MIN_DAYS_FOR_MONTH_EFFECT
+            else np.zeros(12)
+        )
+    else:
+        baseline = 0.0
+        weekday_effect = np.zeros(7)
+        month_effect = np.zeros(12)
+    expected = (
+        baseline + weekday_effect[_weekdays(ahead)] + month_effect[_months(ahead)]
+    )
+    net = expected - bills
+    balance = np.cumsum(net)
+    return {
+        "as_of": today.isoformat(),
+        "history_days": int(flow.size),
+        "baseline": round(float(baseline), 2),
+        "rolling_mean": {
+            str(w): round(float(rolling_mean(flow, w)[-1]), 2) if flow.size else 0.0
+            for w in ROLLING_WINDOWS
+        },
+        "weekday_effect": np.round(weekday_effect, 2).tolist(),
+        "month_effect": np.round(month_effect, 2).tolist(),
+        "days": [
+            {"date": d.isoformat(), "net": n, "bills": b, "balance": c}
+            for d, n, b, c in zip(
+                ahead.tolist(),
+                np.round(net, 2).tolist(),
+                np.round(bills, 2).tolist(),
+                np.round(balance, 2).tolist(),
+            )
+        ],
+    }
+
+
+def forecast(uid: int, today: date | None = None) -> dict:
+    today = today or date.today()
+    start, flow = daily_net_flow(uid, today)
+    return build_forecast(start, flow, bill_outflows(uid, today, HORIZON_DAYS), today)
@@ -0,0 +1,155 @@
+"""Shared outbound HTTP clients for AI and messaging providers.
+
+Keep-alive ``requests`` sessions and one OpenAI client per process, so
+provider calls reuse pooled connections instead of paying a TCP and TLS
+handshake each time. All are rebuilt after a fork: a gunicorn worker must
+not share sockets with its master.
+"""
+
+import os
+import threading
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from ..config import Settings
+from . import metrics
+
+try:
+    from openai import OpenAI
+except Exception:  # pragma: no cover
+    OpenAI = None
+
+
+_settings = Settings()
+_lock = threading.Lock()
+_pid: int | None = None
+_sessions: dict[str, requests.Session] = {}
+_openai = None
+
+# Longest pause the OpenAI SDK makes between its retries
+OPENAI_MAX_RETRY_DELAY_SECONDS = 8.0
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Statuses each named session retries. Messaging APIs send on POST and
+# report rate limits the caller must honour, so only connection errors are
+# retried there.
+SESSION_RETRY_STATUSES = {"providers": RETRY_STATUSES, "messaging": ()}
+
+
+def timeout() -> tuple[float, float]:
+    """(connect, read) timeout for requests calls."""
+    return _settings.http_connect_timeout_seconds, _settings.http_read_timeout_seconds
+
+
+def openai_call_budget_seconds() -> float:
+    """Upper bound on one OpenAI call, counting every retry and its backoff."""
+    connect, read = timeout()
+    retries = _settings.http_retries
+    return (connect + read) * (retries + 1) + OPENAI_MAX_RETRY_DELAY_SECONDS * retries
+
+
+def session(name: str = "providers") -> requests.Session:
+    with _lock:
+        _forget_after_fork()
+        if name not in _sessions:
+            _sessions[name] = _build_session(SESSION_RETRY_STATUSES[name])
+        return _sessions[name]
+
+
+def openai_client():
+    """Cached OpenAI client, or None when no API key or SDK is available."""
+    global _openai
+    if not (_settings.openai_api_key and OpenAI):
+        return None
+    with _lock:
+        _forget_after_fork()
+        if _openai is None:
+            _openai = OpenAI(
+                api_key=_settings.openai_api_key,
+                max_retries=_settings.http_retries,
+                http_client=_build_httpx_client(),
+            )
+        return _openai
+
+
+def _forget_after_fork() -> None:
+    # Caller holds _lock.
+    global _pid, _openai
+    pid = os.getpid()
+    if _pid != pid:
+        _pid, _openai = pid, None
+        _sessions.clear()
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        metrics.incr("http.session.connections_opened")
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        metrics.incr("http.session.connections_opened")
+        return super()._new_conn()
+
+
+class _PooledAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+
+def _build_session(retry_statuses: tuple[int, ...]) -> requests.Session:
+    retry = Retry(
+        total=_settings.http_retries,
+        # A read timeout may mean the provider is still working (and billing).
+        read=0,
+        status_forcelist=retry_statuses,
+        # Otherwise urllib3 sleeps on 429 Retry-After itself.
+        respect_retry_after_header=429 in retry_statuses,
+        allowed_methods=None,
+        backoff_factor=_settings.http_backoff_seconds,
+        backoff_jitter=_settings.http_backoff_seconds,
+        raise_on_status=False,
+    )
+    adapter = _PooledAdapter(
+        pool_connections=_settings.http_pool_hosts,
+        pool_maxsize=_settings.http_pool_maxsize,
+        max_retries=retry,
+    )
+    s = requests.Session()
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.hooks["response"].append(
+        lambda resp, *args, **kwargs: metrics.incr("http.session.requests")
+    )
+    return s
+
+
+def _count_openai_connections(event_name: str, info: dict) -> None:
+    if event_name == "connection.connect_tcp.complete":
+        metrics.incr("http.openai.connections_opened")
+
+
+def _trace_openai_request(request: httpx.Request) -> None:
+    metrics.incr("http.openai.requests")
+    request.extensions["trace"] = _count_openai_connections
+
+
+def _build_httpx_client() -> httpx.Client:
+    connect, read = timeout()
+    return httpx.Client(
+        timeout=httpx.Timeout(read, connect=connect),
+        limits=httpx.Limits(
+            max_connections=_settings.http_pool_maxsize,
+            max_keepalive_connections=_settings.http_pool_maxsize,
+        ),
+        event_hooks={"request": [_trace_openai_request]},
+    )
@@ -0,0 +1,295 @@
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Protocol
+
+from flask import current_app
+
+from ..extensions import db, redis_binary_client, redis_client
+from . import expense_import
+
+logger = logging.getLogger("finmind.import_jobs")
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobBackend(Protocol):
+    def save(self, job: dict[str, Any], ttl: int) -> None: ...
+
+    def get(self, job_id: str) -> dict[str, Any] | None: ...
+
+    def put_payload(self, job_id: str, data: bytes, ttl: int) -> None: ...
+
+    def get_payload(self, job_id: str) -> bytes | None: ...
+
+    def delete_payload(self, job_id: str) -> None: ...
+
+    def enqueue(self, job_id: str) -> None: ...
+
+    def dequeue(self, timeout: float) -> str | None: ...
+
+    def heartbeat(self, job_id: str, at: float) -> None: ...
+
+    def clear_heartbeat(self, job_id: str) -> bool: ...
+
+    def stale(self, before: float) -> list[str]: ...
+
+
+class RedisJobBackend:
+    """Job state and uploads in Redis, shared by web and worker processes."""
+
+    queue_key = "import_jobs:queue"
+    # Running job ids scored by their last heartbeat
+    running_key = "import_jobs:running"
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"import_job:{job_id}"
+
+    def save(self, job, ttl):
+        redis_client.setex(self._key(job["id"]), ttl, json.dumps(job))
+
+    def get(self, job_id):
+        raw = redis_client.get(self._key(job_id))
+        return json.loads(raw) if raw else None
+
+    def put_payload(self, job_id, data, ttl):
+        redis_binary_client.setex(self._key(job_id) + ":payload", ttl, data)
+
+    def get_payload(self, job_id):
+        return redis_binary_client.get(self._key(job_id) + ":payload")
+
+    def delete_payload(self, job_id):
+        redis_binary_client.delete(self._key(job_id) + ":payload")
+
+    def enqueue(self, job_id):
+        redis_client.lpush(self.queue_key, job_id)
+
+    def dequeue(self, timeout):
+        item = redis_client.brpop(self.queue_key, timeout=max(1, int(timeout)))
+        return item[1] if item else None
+
+    def heartbeat(self, job_id, at):
+        redis_client.zadd(self.running_key, {job_id: at})
+
+    def clear_heartbeat(self, job_id):
+        return bool(redis_client.zrem(self.running_key, job_id))
+
+    def stale(self, before):
+        return redis_client.zrangebyscore(self.running_key, "-inf", before)
+
+
+class InMemoryJobBackend:
+    """Single-process backend for tests and local development."""
+
+    def __init__(self):
+        self._jobs: dict[str, dict[str, Any]] = {}
+        self._payloads: dict[str, bytes] = {}
+        self._queue: queue.Queue[str] = queue.Queue()
+        self._running: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def save(self, job, ttl):
+        with self._lock:
+            self._jobs[job["id"]] = json.loads(json.dumps(job))
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return json.loads(json.dumps(job)) if job else None
+
+    def put_payload(self, job_id, data, ttl):
+        with self._lock:
+            self._payloads[job_id] = data
+
+    def get_payload(self, job_id):
+        with self._lock:
+            return self._payloads.get(job_id)
+
+    def delete_payload(self, job_id):
+        with self._lock:
+            self._payloads.pop(job_id, None)
+
+    def enqueue(self, job_id):
+        self._queue.put(job_id)
+
+    def dequeue(self, timeout):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def heartbeat(self, job_id, at):
+        with self._lock:
+            self._running[job_id] = at
+
+    def clear_heartbeat(self, job_id):
+        with self._lock:
+            return self._running.pop(job_id, None) is not None
+
+    def stale(self, before):
+        with self._lock:
+            return [j for j, at in self._running.items() if at <= before]
+
+
+def get_backend() -> JobBackend:
+    backend = current_app.extensions.get("import_jobs")
+    if backend is None:
+        kind = current_app.config.get("IMPORT_JOB_BACKEND", "redis")
+        backend = InMemoryJobBackend() if kind == "memory" else RedisJobBackend()
+        current_app.extensions["import_jobs"] = backend
+    return backend
+
+
+def _ttl() -> int:
+    return int(current_app.config.get("IMPORT_JOB_TTL_SECONDS", 24 * 3600))
+
+
+def _stale_seconds() -> float:
+    return float(current_app.config.get("IMPORT_JOB_STALE_SECONDS", 300))
+
+
+class _Heartbeat:
+    """Refreshes a running job's heartbeat from a background thread."""
+
+    def __init__(self, backend: JobBackend, job_id: str, interval: float):
+        self._backend = backend
+        self._job_id = job_id
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            try:
+                self._backend.heartbeat(self._job_id, time.time())
+            except Exception:
+                logger.warning("Import job heartbeat failed id=%s", self._job_id)
+
+    def __enter__(self):
+        self._backend.heartbeat(self._job_id, time.time())
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def submit(uid: int, filename: str, content_type: str | None, data: bytes) -> dict:
+    backend = get_backend()
+    job = {
+        "id": uuid.uuid4().hex,
+        "user_id": uid,
+        "filename": filename,
+        "content_type": content_type,
+        "status": QUEUED,
+        "processed": 0,
+        "created_at": time.time(),
+        "updated_at": time.time(),
+    }
+    backend.put_payload(job["id"], data, _ttl())
+    backend.save(job, _ttl())
+    backend.enqueue(job["id"])
+    logger.info("Queued import job id=%s user=%s", job["id"], uid)
+    return job
+
+
+def get_job(job_id: str, uid: int) -> dict[str, Any] | None:
+    job = get_backend().get(job_id)
+    if not job or job.get("user_id") != uid:
+        return None
+    return job
+
+
+def _update(job: dict[str, Any], **fields):
+    job.update(fields, updated_at=time.time())
+    get_backend().save(job, _ttl())
+
+
+def run_job(job_id: str) -> dict[str, Any] | None:
+    backend = get_backend()
+    job = backend.get(job_id)
+    if not job:
+        logger.warning("Import job expired before it ran id=%s", job_id)
+        return None
+    data = backend.get_payload(job_id)
+    if data is None:
+        _update(job, status=FAILED, error="upload expired")
+        return job
+    # The upload is kept until the job is done or failed, so a job whose
+    # worker dies can be picked up again by requeue_stale().
+    _update(job, status=RUNNING, attempts=job.get("attempts", 0) + 1)
+    try:
+        with _Heartbeat(backend, job_id, _stale_seconds() / 4):
+            result = expense_import.preview_statement(
+                job["user_id"],
+                filename=job["filename"],
+                content_type=job["content_type"],
+                data=data,
+                gemini_api_key=current_app.config.get("GEMINI_API_KEY"),
+                gemini_model=current_app.config.get("GEMINI_MODEL", "gemini-1.5-flash"),
+                on_progress=lambda n: _update(job, processed=n),
+            )
+    except ValueError as exc:
+        _update(job, status=FAILED, error=str(exc))
+    except Exception as exc:
+        logger.exception("Import job failed id=%s", job_id)
+        _update(job, status=FAILED, error=f"failed to parse statement: {exc}")
+    else:
+        _update(job, status=DONE, processed=result["total"], result=result)
+    finally:
+        # An interrupted run keeps its payload and heartbeat entry so that
+        # the job goes stale and is requeued.
+        if job["status"] in (DONE, FAILED):
+            backend.delete_payload(job_id)
+            backend.clear_heartbeat(job_id)
+        # Workers are long-lived; don't keep a transaction open between jobs.
+        db.session.remove()
+    logger.info("Import job finished id=%s status=%s", job_id, job["status"])
+    return job
+
+
+def requeue_stale() -> int:
+    """Requeue running jobs whose worker stopped sending heartbeats.
+
+    A job that has already been attempted ``IMPORT_JOB_MAX_ATTEMPTS`` times is
+    failed instead. Returns the number of jobs recovered.
+    """
+    backend = get_backend()
+    recovered = 0
+    for job_id in backend.stale(time.time() - _stale_seconds()):
+        # Only the worker that removes the heartbeat entry recovers the job.
+        if not backend.clear_heartbeat(job_id):
+            continue
+        job = backend.get(job_id)
+        if not job or job["status"] != RUNNING:
+            continue
+        recovered += 1
+        if job.get("attempts", 0) >= current_app.config.get(
+            "IMPORT_JOB_MAX_ATTEMPTS", 3
+        ):
+            logger.warning("Import job abandoned id=%s", job_id)
+            _update(job, status=FAILED, error="import worker stopped responding")
+            backend.delete_payload(job_id)
+            continue
+        logger.warning("Requeueing stale import job id=%s", job_id)
+        _update(job, status=QUEUED)
+        backend.enqueue(job_id)
+    return recovered
+
+
+def work_once(timeout: float = 5.0) -> bool:
+    """Run the next queued job, waiting up to ``timeout`` seconds for one."""
+    requeue_stale()
+    job_id = get_backend().dequeue(timeout)
+    if job_id is None:
+        return False
+    run_job(job_id)
+    return True
@@ -0,0 +1,23 @@
+import logging
+
+import redis
+
+from ..extensions import redis_client
+
+logger = logging.getLogger("finmind.metrics")
+
+# Counters live in one Redis hash so every web and worker process adds to the
+# same totals.
+METRICS_KEY = "metrics:counters"
+
+
+def incr(name: str, amount: int = 1) -> None:
+    try:
+        redis_client.hincrby(METRICS_KEY, name, amount)
+    except redis.RedisError:
+        logger.warning("Failed to record metric %s", name, exc_info=True)
+
+
+def snapshot() -> dict[str, int]:
+    raw = redis_client.hgetall(METRICS_KEY)
+    return {name: int(value) for name, value in sorted(raw.items())}
@@ -0,0 +1,40 @@
+from datetime import date
+
+from sqlalchemy import Date, case, cast, func
+
+from ..extensions import db
+
+
+def month_range(ym: str) -> tuple[date, date]:
+    """Return the half-open ``[first_day, next_month_first_day)`` for YYYY-MM."""
+    year, month = map(int, ym.split("-"))
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def sum_where(column, condition):
+    """SUM(column) over rows matching condition, as a single-pass aggregate.
+
+    Postgres gets ``SUM(...) FILTER (WHERE ...)``; other dialects fall back to
+    conditional aggregation with ``CASE``. Both yield NULL when nothing matches.
+    """
+    if db.engine.dialect.name == "postgresql":
+        return func.sum(column).filter(condition)
+    return func.sum(case((condition, column)))
+
+
+def month_start(column):
+    """First day of the month containing a DATE column, as a DATE."""
+    if db.engine.dialect.name == "postgresql":
+        return cast(func.date_trunc("month", column), Date)
+    return func.date(column, "start of month", type_=Date)
+
+
+def dialect_insert(model):
+    # Both dialects expose the same on_conflict_do_update/do_nothing API.
+    if db.engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
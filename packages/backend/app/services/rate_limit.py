@@ -0,0 +1,63 @@
+import time
+
+from ..extensions import redis_client
+
+# Refill-on-read token bucket. Tokens and the last refill time live in one
+# hash, so every worker process draws from the same budget. A separate
+# ":pause" key blocks the bucket entirely (e.g. after a provider 429).
+# Returns {1, 0} when a token was taken, otherwise {0, ms to wait}.
+_TOKEN_BUCKET_LUA = """
+local pause = redis.call('PTTL', KEYS[2])
+if pause > 0 then
+  return {0, pause}
+end
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate / 1000)
+-- Callers' clocks race; never move ts back or the same interval refills twice.
+now = math.max(now, ts)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+else
+  wait = math.ceil((1 - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + 1000)
+return {allowed, wait}
+"""
+
+
+class TokenBucket:
+    """A rate limit shared through Redis by every process using ``name``."""
+
+    def __init__(self, name: str, rate: float, capacity: float | None = None):
+        self.key = f"ratelimit:{name}"
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._script = redis_client.register_script(_TOKEN_BUCKET_LUA)
+
+    def acquire(self, timeout: float) -> bool:
+        """Take one token, waiting up to ``timeout`` seconds for it."""
+        deadline = time.monotonic() + timeout
+        while True:
+            allowed, wait_ms = self._script(
+                keys=[self.key, self.key + ":pause"],
+                args=[self.rate, self.capacity, int(time.time() * 1000)],
+            )
+            if allowed:
+                return True
+            wait = int(wait_ms) / 1000
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for ``seconds``, across all processes."""
+        redis_client.set(self.key + ":pause", 1, px=max(1, int(seconds * 1000)))
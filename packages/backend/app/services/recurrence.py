@@ -0,0 +1,83 @@
+import calendar
+from datetime import date, timedelta
+
+import numpy as np
+
+from ..models import BillCadence
+
+# Whole months between occurrences of calendar-based cadences.
+_MONTH_STEPS = {BillCadence.MONTHLY: 1, BillCadence.YEARLY: 12}
+_WEEK_DAYS = 7
+
+
+def add_months(d: date, months: int, day: int | None = None) -> date:
+    """Move ``d`` by whole months onto ``day`` (default ``d.day``).
+
+    The day is clamped to the end of the target month, so the 31st lands on
+    Feb 28/29 and a Feb 29 yearly bill falls on Feb 28 outside leap years.
+    """
+    year, month0 = divmod(d.year * 12 + d.month - 1 + months, 12)
+    last = calendar.monthrange(year, month0 + 1)[1]
+    return date(year, month0 + 1, min(day or d.day, last))
+
+
+def next_occurrence(
+    current: date, cadence: BillCadence | str, anchor_day: int | None = None
+) -> date | None:
+    """The occurrence after ``current``, or None for one-off bills.
+
+    ``anchor_day`` is the bill's intended day of month; without it a bill
+    clamped to Feb 28 would stay on the 28th for the rest of its life.
+    """
+    cadence = BillCadence(cadence)
+    if cadence == BillCadence.WEEKLY:
+        return current + timedelta(days=_WEEK_DAYS)
+    step = _MONTH_STEPS.get(cadence)
+    if step is None:
+        return None
+    return add_months(current, step, anchor_day)
+
+
+def project(next_due, cadences, anchor_days, until: date, start: date | None = None):
+    """Every occurrence of a batch of bills in ``[start, until)``.
+
+    Takes parallel sequences with one entry per bill, stepping from each
+    bill's next due date. Without ``start`` overdue occurrences are included;
+    with it an overdue bill begins at its first occurrence on or after
+    ``start`` and a past one-off bill is dropped. All bills are laid out on one
+    ``(bills, occurrences)`` grid of ``datetime64`` values and masked, instead of
+    stepping each bill in Python. Returns ``(positions, dates)``: the index of
+    the bill each occurrence belongs to and its ``datetime64[D]`` date, ordered
+    by date and then position.
+    """
+    due = np.asarray(next_due, dtype="datetime64[D]")
+    if due.size == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype="datetime64[D]")
+    cadences = [BillCadence(c) for c in cadences]
+    month_step = np.array([_MONTH_STEPS.get(c, 0) for c in cadences])
+    weekly = np.array([c == BillCadence.WEEKLY for c in cadences])
+    recurring = weekly | (month_step > 0)
+
+    due_month = due.astype("datetime64[M]")
+    due_day = (due - due_month.astype("datetime64[D]")).astype(np.int64) + 1
+    anchor = np.array([a or 0 for a in anchor_days], dtype=np.int64)
+    anchor = np.where(anchor > 0, anchor, due_day)
+
+    end = np.datetime64(until, "D")
+    span = max(int((end - due.min()).astype(np.int64)), 0)
+    k = np.arange(span // _WEEK_DAYS + 1)
+
+    months = due_month[:, None] + month_step[:, None] * k
+    month_start = months.astype("datetime64[D]")
+    month_len = ((months + 1).astype("datetime64[D]") - month_start).astype(np.int64)
+    monthly = month_start + (np.minimum(anchor[:, None], month_len) - 1)
+    dates = np.where(weekly[:, None], due[:, None] + _WEEK_DAYS * k, monthly)
+    dates[:, 0] = due
+
+    keep = (recurring[:, None] | (k == 0)) & (dates < end)
+    if start is not None:
+        keep &= dates >= np.datetime64(start, "D")
+    positions, steps = np.nonzero(keep)
+    dates = dates[positions, steps]
+    order = np.lexsort((positions, dates))
+    return positions[order], dates[order]
@@ -0,0 +1,158 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import false, select, update
+
+from ..config import Settings
+from ..extensions import db, redis_client
+from ..models import Reminder, User
+from . import metrics
+from .reminders import SendResult, send_reminder
+
+logger = logging.getLogger("finmind.reminder_dispatch")
+
+_settings = Settings()
+
+# User ids that asked for an immediate run through /reminders/run
+RUN_REQUESTS_KEY = "reminders:run_requests"
+
+
+def channel_kind(channel: str) -> str:
+    return "whatsapp" if channel.startswith("whatsapp:") else "email"
+
+
+class ReminderDispatcher:
+    """Claims due reminders in batches and sends them concurrently.
+
+    A batch is selected FOR UPDATE SKIP LOCKED and stays locked while it is
+    sent, so concurrent dispatchers never pick up the same rows. Delivered
+    rows are marked sent in the same transaction; failed ones stay unsent with
+    their attempt count raised and are retried on later runs until
+    ``reminder_max_attempts``. Throttled ones stay unsent without using up an
+    attempt. A dispatcher that dies mid-batch leaves its rows unsent for the
+    next run.
+    """
+
+    def __init__(self, batch_size: int | None = None):
+        self.batch_size = batch_size or _settings.reminder_batch_size
+        self._pools = {
+            "email": ThreadPoolExecutor(
+                _settings.reminder_email_concurrency, thread_name_prefix="email"
+            ),
+            "whatsapp": ThreadPoolExecutor(
+                _settings.reminder_whatsapp_concurrency, thread_name_prefix="whatsapp"
+            ),
+        }
+
+    def close(self):
+        for pool in self._pools.values():
+            pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def run_once(self, user_id: int | None = None, now: datetime | None = None) -> int:
+        """Send everything due by ``now``; returns the number of reminders."""
+        now = now or datetime.utcnow() + timedelta(minutes=1)
+        total = 0
+        # Rows that failed or were throttled in this run wait for the next one.
+        tried: set[int] = set()
+        while True:
+            claimed = self._dispatch_batch(now, user_id, tried)
+            total += claimed
+            if claimed < self.batch_size:
+                return total
+
+    def run_requested(self) -> int:
+        """Run the users queued by /reminders/run; returns reminders sent."""
+        total = 0
+        while True:
+            user_ids = redis_client.spop(RUN_REQUESTS_KEY, 100)
+            if not user_ids:
+                return total
+            for uid in user_ids:
+                total += self.run_once(user_id=int(uid))
+
+    def _dispatch_batch(self, now: datetime, user_id: int | None, tried: set) -> int:
+        return self._claim(self.claim_query(now, user_id, tried), tried)
+
+    def claim_query(self, now: datetime, user_id: int | None, tried: set = ()):
+        """The due, unsent rows to claim, locked FOR UPDATE SKIP LOCKED."""
+        # "= false" rather than "IS FALSE" so Postgres can use the partial
+        # idx_reminders_pending index.
+        q = (
+            select(Reminder.id, Reminder.channel, Reminder.message, User.email)
+            .join(User, User.id == Reminder.user_id)
+            .where(
+                Reminder.sent == false(),
+                Reminder.send_at <= now,
+                Reminder.attempts < _settings.reminder_max_attempts,
+            )
+            .order_by(Reminder.send_at, Reminder.id)
+            .limit(self.batch_size)
+            .with_for_update(of=Reminder, skip_locked=True)
+        )
+        if user_id is not None:
+            q = q.where(Reminder.user_id == user_id)
+        if tried:
+            q = q.where(Reminder.id.not_in(tried))
+        return q
+
+    def _claim(self, q, tried: set) -> int:
+        try:
+            rows = db.session.execute(q).all()
+            futures = [
+                (r.id, self._pools[channel_kind(r.channel)].submit(send_reminder, r))
+                for r in rows
+            ]
+            outcomes = {rid: _outcome(f) for rid, f in futures}
+            delivered = [
+                rid for rid, o in outcomes.items() if o is SendResult.DELIVERED
+            ]
+            failed = [rid for rid, o in outcomes.items() if o is SendResult.FAILED]
+            if delivered:
+                db.session.execute(
+                    update(Reminder).where(Reminder.id.in_(delivered)).values(sent=True)
+                )
+            if failed:
+                db.session.execute(
+                    update(Reminder)
+                    .where(Reminder.id.in_(failed))
+                    .values(attempts=Reminder.attempts + 1)
+                )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        tried.update(
+            rid for rid, o in outcomes.items() if o is not SendResult.DELIVERED
+        )
+        if rows:
+            metrics.incr("reminders.delivered", len(delivered))
+            metrics.incr("reminders.failed", len(failed))
+            metrics.incr(
+                "reminders.throttled", len(rows) - len(delivered) - len(failed)
+            )
+            logger.info(
+                "Dispatched reminders count=%s delivered=%s",
+                len(rows),
+                len(delivered),
+            )
+        return len(rows)
+
+
+def _outcome(future) -> SendResult:
+    try:
+        return future.result()
+    except Exception:
+        logger.exception("Reminder sender raised")
+        return SendResult.FAILED
+
+
+def request_run(user_id: int) -> None:
+    """Ask the dispatcher process to send this user's due reminders soon."""
+    redis_client.sadd(RUN_REQUESTS_KEY, user_id)
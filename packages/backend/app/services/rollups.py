@@ -0,0 +1,197 @@
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import delete, exists, func, insert, select
+
+from ..extensions import db
+from ..models import Expense, MonthlyRollup
+from .queries import dialect_insert, month_start
+
+# monthly_rollups.category_id is part of the primary key, so uncategorized
+# expenses are stored under 0 instead of NULL.
+UNCATEGORIZED = 0
+
+RollupKey = tuple[int, date, int, str]
+
+
+class RollupDeltas:
+    """Accumulates signed (amount, count) changes per rollup key."""
+
+    def __init__(self):
+        self._deltas: dict[RollupKey, list] = defaultdict(lambda: [Decimal("0"), 0])
+
+    def add(
+        self,
+        user_id: int,
+        spent_at: date,
+        category_id: int | None,
+        expense_type: str,
+        amount,
+        count: int = 1,
+    ):
+        key = (
+            int(user_id),
+            spent_at.replace(day=1),
+            int(category_id or UNCATEGORIZED),
+            str(expense_type),
+        )
+        entry = self._deltas[key]
+        entry[0] += Decimal(str(amount))
+        entry[1] += count
+
+    def add_expense(self, e: Expense, sign: int = 1):
+        amount = Decimal(str(e.amount)) * sign
+        self.add(e.user_id, e.spent_at, e.category_id, e.expense_type, amount, sign)
+
+    def rows(self) -> list[dict]:
+        return [
+            {
+                "user_id": user_id,
+                "month": month,
+                "category_id": category_id,
+                "expense_type": expense_type,
+                "total_amount": amount,
+                "tx_count": count,
+            }
+            for (user_id, month, category_id, expense_type), (
+                amount,
+                count,
+            ) in self._deltas.items()
+            if amount or count
+        ]
+
+
+def apply_deltas(deltas: RollupDeltas, chunk_size: int = 500):
+    """Upsert deltas into monthly_rollups within the caller's transaction."""
+    rows = deltas.rows()
+    if not rows:
+        return
+    for start in range(0, len(rows), chunk_size):
+        stmt = dialect_insert(MonthlyRollup).values(rows[start : start + chunk_size])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "month", "category_id", "expense_type"],
+            set_={
+                "total_amount": MonthlyRollup.total_amount + stmt.excluded.total_amount,
+                "tx_count": MonthlyRollup.tx_count + stmt.excluded.tx_count,
+            },
+        )
+        db.session.execute(stmt)
+    user_ids = {r["user_id"] for r in rows}
+    db.session.execute(
+        delete(MonthlyRollup).where(
+            MonthlyRollup.user_id.in_(user_ids), MonthlyRollup.tx_count <= 0
+        )
+    )
+
+
+def move_category_to_uncategorized(user_id: int, category_id: int):
+    deltas = RollupDeltas()
+    rows = db.session.execute(
+        select(
+            MonthlyRollup.month,
+            MonthlyRollup.expense_type,
+            MonthlyRollup.total_amount,
+            MonthlyRollup.tx_count,
+        ).where(
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.category_id == category_id,
+        )
+    ).all()
+    for month, expense_type, amount, count in rows:
+        deltas.add(user_id, month, UNCATEGORIZED, expense_type, amount, count)
+        deltas.add(user_id, month, category_id, expense_type, -amount, -count)
+    apply_deltas(deltas)
+
+
+def _raw_aggregate(user_id: int | None):
+    month = month_start(Expense.spent_at)
+    category_id = func.coalesce(Expense.category_id, UNCATEGORIZED)
+    stmt = select(
+        Expense.user_id,
+        month.label("month"),
+        category_id.label("category_id"),
+        Expense.expense_type,
+        func.sum(Expense.amount).label("total_amount"),
+        func.count(Expense.id).label("tx_count"),
+    ).group_by(Expense.user_id, month, category_id, Expense.expense_type)
+    if user_id is not None:
+        stmt = stmt.where(Expense.user_id == user_id)
+    return stmt
+
+
+def rebuild(user_id: int | None = None) -> int:
+    """Recompute monthly_rollups from raw expenses; returns the row count."""
+    clear = delete(MonthlyRollup)
+    if user_id is not None:
+        clear = clear.where(MonthlyRollup.user_id == user_id)
+    db.session.execute(clear)
+    result = db.session.execute(
+        insert(MonthlyRollup).from_select(
+            [
+                "user_id",
+                "month",
+                "category_id",
+                "expense_type",
+                "total_amount",
+                "tx_count",
+            ],
+            _raw_aggregate(user_id),
+        )
+    )
+    return result.rowcount
+
+
+def verify(user_id: int | None = None) -> list[str]:
+    """Compare monthly_rollups with raw aggregates and describe differences."""
+
+    def _key(row) -> RollupKey:
+        return (row.user_id, row.month, int(row.category_id), row.expense_type)
+
+    expected = {
+        _key(r): (Decimal(str(r.total_amount)), r.tx_count)
+        for r in db.session.execute(_raw_aggregate(user_id))
+    }
+    stored_stmt = select(MonthlyRollup)
+    if user_id is not None:
+        stored_stmt = stored_stmt.where(MonthlyRollup.user_id == user_id)
+    stored = {
+        _key(r): (Decimal(str(r.total_amount)), r.tx_count)
+        for r in db.session.scalars(stored_stmt)
+    }
+    problems = []
+    for key in sorted(set(expected) | set(stored)):
+        if expected.get(key) != stored.get(key):
+            problems.append(
+                f"user={key[0]} month={key[1]:%Y-%m} category={key[2]} "
+                f"type={key[3]} expected={expected.get(key)} "
+                f"stored={stored.get(key)}"
+            )
+    return problems
+
+
+def rebuild_verified(user_id: int | None = None) -> tuple[int, list[str]]:
+    """Rebuild and verify in one transaction, committing only a clean result.
+
+    Returns the row count and the mismatches; on any mismatch the rebuild is
+    rolled back and the previous rollups stay in place.
+    """
+    try:
+        rows = rebuild(user_id)
+        problems = verify(user_id)
+    except Exception:
+        db.session.rollback()
+        raise
+    if problems:
+        db.session.rollback()
+    else:
+        db.session.commit()
+    return rows, problems
+
+
+def needs_backfill() -> bool:
+    """True when expenses exist but monthly_rollups is empty, e.g. right after
+    the table was added to an existing database."""
+    has_expenses = db.session.scalar(select(exists().select_from(Expense)))
+    has_rollups = db.session.scalar(select(exists().select_from(MonthlyRollup)))
+    return bool(has_expenses and not has_rollups)
@@ -0,0 +1,46 @@
+import re
+
+from sqlalchemy import func, literal_column, select, table
+
+from ..extensions import db
+from ..models import Expense
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MAX_SEARCH_TERMS = 8
+
+
+def search_terms(raw: str) -> list[str]:
+    return [t.lower() for t in _TOKEN_RE.findall(raw or "")][:MAX_SEARCH_TERMS]
+
+
+def search_expenses(q, search: str):
+    """Filter an Expense query by notes full-text search.
+
+    Every term must match, and the last one matches as a prefix so results
+    update while the user types. Returns the filtered query and an ORDER BY
+    clause ranking the best matches first, or None when the search has no word
+    characters and the caller should fall back to a substring match.
+    """
+    terms = search_terms(search)
+    if not terms:
+        return q, None
+    if db.engine.dialect.name == "postgresql":
+        tsquery = func.to_tsquery("simple", " & ".join(terms[:-1] + [f"{terms[-1]}:*"]))
+        vector = func.to_tsvector("simple", func.coalesce(Expense.notes, ""))
+        q = q.filter(vector.op("@@")(tsquery))
+        return q, func.ts_rank(vector, tsquery).desc()
+
+    fts = table("expenses_fts")
+    quoted = [f'"{t}"' for t in terms]
+    quoted[-1] += "*"
+    matches = (
+        select(
+            literal_column("rowid").label("expense_id"),
+            literal_column("bm25(expenses_fts)").label("rank"),
+        )
+        .select_from(fts)
+        .where(literal_column("expenses_fts").op("MATCH")(" ".join(quoted)))
+        .subquery()
+    )
+    q = q.join(matches, matches.c.expense_id == Expense.id)
+    return q, matches.c.rank.asc()
@@ -0,0 +1,69 @@
+import json
+import time
+from datetime import date
+
+import pytest
+from flask import jsonify
+from flask.json.provider import DefaultJSONProvider
+
+from app.services.cache import cache_get_raw, dashboard_summary_key
+
+
+def _seed(client, auth_header):
+    for name in ("Food", "Rent", "Travel", "Fun"):
+        client.post("/categories", json={"name": name}, headers=auth_header)
+    for i in range(40):
+        client.post(
+            "/expenses",
+            json={
+                "amount": 10 + i,
+                "description": f"Purchase {i}",
+                "category_id": i % 4 + 1,
+            },
+            headers=auth_header,
+        )
+    for i in range(8):
+        client.post(
+            "/bills",
+            json={
+                "name": f"Bill {i}",
+                "amount": 20,
+                "next_due_date": date.today().isoformat(),
+            },
+            headers=auth_header,
+        )
+
+
+def _legacy_hit_seconds(app, raw: bytes, rounds: int = 500) -> float:
+    """The old hit path: stdlib-decode the cached JSON, then re-encode it."""
+    app.json = DefaultJSONProvider(app)
+    with app.app_context():
+        best = float("inf")
+        for _ in range(5):
+            started = time.perf_counter()
+            for _ in range(rounds):
+                jsonify(json.loads(raw)).get_data()
+            best = min(best, (time.perf_counter() - started) / rounds)
+    return best
+
+
+@pytest.mark.timing
+def test_bench_dashboard_cache_hit(benchmark, app_fixture, client, auth_header):
+    _seed(client, auth_header)
+    miss = client.get("/dashboard/summary", headers=auth_header)
+    raw = cache_get_raw(dashboard_summary_key(1, date.today().strftime("%Y-%m")))
+    assert raw == miss.data
+
+    def _hit():
+        return client.get("/dashboard/summary", headers=auth_header)
+
+    response = benchmark(_hit)
+    assert response.data == raw
+
+    # The part of a hit this change removes, without Redis or JWT around it.
+    with app_fixture.app_context():
+        started = time.perf_counter()
+        for _ in range(500):
+            app_fixture.response_class(raw, mimetype="application/json").get_data()
+        raw_seconds = (time.perf_counter() - started) / 500
+    assert _legacy_hit_seconds(app_fixture, raw) / raw_seconds >= 3
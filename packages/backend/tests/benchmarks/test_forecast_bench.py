@@ -0,0 +1,23 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.services import forecast
+
+HISTORY_DAYS = 10 * 365
+
+
+@pytest.mark.timing
+def test_bench_forecast_ten_years(benchmark):
+    rng = np.random.default_rng(7)
+    flow = rng.normal(-40.0, 25.0, HISTORY_DAYS)
+    flow[::14] += 2500.0  # fortnightly salary
+    bills = np.zeros(forecast.HORIZON_DAYS)
+    bills[::30] = 900.0
+    start = date(2016, 1, 1)
+    today = (np.datetime64(start, "D") + HISTORY_DAYS).item()
+
+    out = benchmark(forecast.build_forecast, start, flow, bills, today)
+    assert len(out["days"]) == forecast.HORIZON_DAYS
+    assert benchmark.stats.stats.min < 0.01
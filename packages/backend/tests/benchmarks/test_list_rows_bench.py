@@ -0,0 +1,74 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import Expense
+from app.routes.expenses import _LIST_COLUMNS, _expense_to_dict, _rows_to_dicts
+
+PAGE = 200
+
+
+def _legacy_page(uid):
+    items = (
+        db.session.query(Expense)
+        .filter_by(user_id=uid)
+        .order_by(Expense.spent_at.desc(), Expense.id.desc())
+        .limit(PAGE)
+        .all()
+    )
+    return [_expense_to_dict(e) for e in items]
+
+
+def _row_page(uid):
+    rows = db.session.execute(
+        select(*_LIST_COLUMNS)
+        .where(Expense.user_id == uid)
+        .order_by(Expense.spent_at.desc(), Expense.id.desc())
+        .limit(PAGE)
+    ).all()
+    return _rows_to_dicts(rows)
+
+
+@pytest.fixture()
+def seeded(app_fixture, auth_header):
+    with app_fixture.app_context():
+        start = date(2026, 1, 1)
+        db.session.add_all(
+            Expense(
+                user_id=1,
+                amount=Decimal(f"{i % 500}.{i % 100:02d}"),
+                category_id=None,
+                notes=f"Purchase {i}",
+                spent_at=start + timedelta(days=i % 365),
+            )
+            for i in range(PAGE * 5)
+        )
+        db.session.commit()
+        yield
+
+
+def _timed(fn) -> float:
+    best = float("inf")
+    for _ in range(20):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        fn(1)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def test_row_page_matches_orm_page(seeded):
+    assert _row_page(1) == _legacy_page(1)
+
+
+@pytest.mark.timing
+def test_bench_expense_page_rows(benchmark, seeded):
+    legacy = _timed(_legacy_page)
+    benchmark.pedantic(
+        _row_page, args=(1,), setup=db.session.expunge_all, rounds=50, warmup_rounds=2
+    )
+    assert legacy / benchmark.stats.stats.min >= 1.5
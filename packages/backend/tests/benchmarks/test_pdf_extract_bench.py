@@ -0,0 +1,53 @@
+import os
+import time
+
+import pytest
+
+from app.services import expense_import
+
+PAGES = 120
+LINES_PER_PAGE = 50
+
+
+@pytest.fixture()
+def big_statement(statement_pdf):
+    return statement_pdf(pages=PAGES, lines_per_page=LINES_PER_PAGE)
+
+
+def _timed_serial(data: bytes) -> float:
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        expense_import._extract_pdf_text(data)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def test_bench_pdf_extract_serial(benchmark, big_statement, monkeypatch):
+    monkeypatch.setattr(expense_import._settings, "pdf_extract_workers", 1)
+    text = benchmark.pedantic(
+        expense_import._extract_pdf_text, args=(big_statement,), rounds=3
+    )
+    assert len(text.splitlines()) == PAGES * LINES_PER_PAGE
+
+
+@pytest.mark.timing
+@pytest.mark.skipif(
+    (os.cpu_count() or 1) < 2, reason="parallel extraction needs 2+ CPUs"
+)
+def test_bench_pdf_extract_parallel(benchmark, big_statement, monkeypatch):
+    monkeypatch.setattr(expense_import._settings, "pdf_extract_workers", 1)
+    expected = expense_import._extract_pdf_text(big_statement)
+    serial = _timed_serial(big_statement)
+    # The warmup round starts the fork server; rounds after it show steady state.
+    monkeypatch.setattr(
+        expense_import._settings, "pdf_extract_workers", min(4, os.cpu_count())
+    )
+    text = benchmark.pedantic(
+        expense_import._extract_pdf_text,
+        args=(big_statement,),
+        rounds=3,
+        warmup_rounds=1,
+    )
+    assert text == expected
+    assert serial / benchmark.stats.stats.min >= 1.3
@@ -1,4 +1,10 @@
+import json
 import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
 import pytest
 from app import create_app
 from app.config import Settings
@@ -7,6 +13,30 @@ from app.extensions import redis_client
 from app import models  # noqa: F401 - ensure models are registered
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-timing",
+        action="store_true",
+        help="run benchmarks that assert wall-clock speedups",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "timing: asserts wall-clock ratios; skipped unless --run-timing"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    # Timing ratios flake on shared CI runners, so the default run skips them.
+    if config.getoption("--run-timing"):
+        return
+    skip = pytest.mark.skip(reason="wall-clock benchmark; use --run-timing")
+    for item in items:
+        if "timing" in item.keywords:
+            item.add_marker(skip)
+
+
 class TestSettings(Settings):
     # Override defaults for tests
     database_url: str = "sqlite+pysqlite:///:memory:"
@@ -27,6 +57,7 @@ def app_fixture():
         database_url="sqlite+pysqlite:///:memory:",
         redis_url="redis://localhost:6379/15",
         jwt_secret="test-secret-with-32-plus-chars-1234567890",
+        metrics_token="test-metrics-token",
     )
     app = create_app(settings)
     app.config.update(TESTING=True)
@@ -66,3 +97,115 @@ def auth_header(client):
     assert r.status_code == 200
     access = r.get_json()["access_token"]
     return {"Authorization": f"Bearer {access}"}
+
+
+@pytest.fixture()
+def metrics_header():
+    return {"Authorization": "Bearer test-metrics-token"}
+
+
+@pytest.fixture()
+def statement_pdf():
+    """Factory for synthetic text PDFs: one statement line per transaction."""
+    from pypdf import PdfWriter
+    from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+    def _build(pages: int, lines_per_page: int = 50) -> bytes:
+        writer = PdfWriter()
+        font = DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject("/Helvetica"),
+            }
+        )
+        for p in range(pages):
+            page = writer.add_blank_page(612, 792)
+            page[NameObject("/Resources")] = DictionaryObject(
+                {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})}
+            )
+            body = [b"BT /F1 9 Tf 36 770 Td 12 TL"]
+            for i in range(lines_per_page):
+                day = i % 28 + 1
+                body.append(b"(2026-03-%02d Page %d item %d -12.34) '" % (day, p, i))
+            body.append(b"ET")
+            stream = DecodedStreamObject()
+            stream.set_data(b"\n".join(body))
+            page.replace_contents(stream)
+        out = BytesIO()
+        writer.write(out)
+        return out.getvalue()
+
+    return _build
+
+
+class FakeGemini:
+    """Local stand-in for the Gemini generateContent endpoint.
+
+    Each "YYYY-MM-DD description amount" line of the prompt's statement text
+    comes back as one transaction after ``delay`` seconds.
+    """
+
+    line_re = re.compile(r"^(\d{4}-\d{2}-\d{2}) (.+) (-?\d+\.\d{2})$", re.M)
+
+    def __init__(self):
+        self.delay = 0.0
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with fake.lock:
+                    fake.requests += 1
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                try:
+                    time.sleep(fake.delay)
+                    prompt = body["contents"][0]["parts"][0]["text"]
+                    statement = prompt.split("STATEMENT_TEXT:\n", 1)[1]
+                    rows = [
+                        {"date": d, "amount": float(a), "description": desc}
+                        for d, desc, a in fake.line_re.findall(statement)
+                    ]
+                    reply = {
+                        "candidates": [
+                            {"content": {"parts": [{"text": json.dumps(rows)}]}}
+                        ]
+                    }
+                    data = json.dumps(reply).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                finally:
+                    with fake.lock:
+                        fake.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1beta"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture()
+def fake_gemini(monkeypatch):
+    from app.services import expense_import
+
+    fake = FakeGemini()
+    monkeypatch.setattr(expense_import._settings, "gemini_base_url", fake.base_url)
+    yield fake
+    fake.close()
@@ -40,3 +40,23 @@ def test_auth_logout_revokes_refresh_token(client):
         "/auth/refresh", headers={"Authorization": f"Bearer {refresh_token}"}
     )
     assert r.status_code == 401
+
+
+def test_metrics_require_the_metrics_token(client, auth_header, metrics_header):
+    assert client.get("/metrics").status_code == 401
+    # A user's access token is not enough.
+    assert client.get("/metrics", headers=auth_header).status_code == 401
+    r = client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+    assert r.status_code == 401
+    r = client.get("/metrics", headers=metrics_header)
+    assert r.status_code == 200
+    assert "counters" in r.get_json()
+
+
+def test_deeply_nested_request_body_is_rejected(client):
+    # orjson before 3.9.15 segfaulted on this (CVE-2024-27454).
+    body = "[" * 200_000 + "]" * 200_000
+    r = client.post("/auth/login", data=body, content_type="application/json")
+    assert r.status_code == 400
+    r = client.post("/auth/login", json={"email": "x@example.com", "password": "x"})
+    assert r.status_code == 401
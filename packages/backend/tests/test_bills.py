@@ -1,4 +1,10 @@
-from datetime import date
+from datetime import date, timedelta
+
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from app.models import BillCadence
+from app.services import recurrence
 
 
 def test_bills_crud_and_mark_paid(client, auth_header):
@@ -31,3 +37,130 @@ def test_bills_crud_and_mark_paid(client, auth_header):
     r = client.post(f"/bills/{bill_id}/pay", headers=auth_header)
     assert r.status_code == 200
     assert r.get_json()["message"] == "updated"
+
+
+def test_mark_paid_follows_the_calendar(client, auth_header):
+    payload = {"name": "Rent", "amount": 900, "next_due_date": "2024-01-31"}
+    bill_id = client.post("/bills", json=payload, headers=auth_header).get_json()["id"]
+    seen = []
+    for _ in range(3):
+        client.post(f"/bills/{bill_id}/pay", headers=auth_header)
+        items = client.get("/bills", headers=auth_header).get_json()
+        seen.append(items[0]["next_due_date"])
+    assert seen == ["2024-02-29", "2024-03-31", "2024-04-30"]
+
+    payload = {"name": "Fine", "amount": 5, "next_due_date": "2024-02-01"}
+    payload["cadence"] = "ONCE"
+    once_id = client.post("/bills", json=payload, headers=auth_header).get_json()["id"]
+    client.post(f"/bills/{once_id}/pay", headers=auth_header)
+    items = client.get("/bills", headers=auth_header).get_json()
+    assert [b["id"] for b in items] == [bill_id]
+
+
+def test_next_occurrence_clamps_to_month_end():
+    yearly = [date(2024, 2, 29)]
+    for _ in range(4):
+        yearly.append(recurrence.next_occurrence(yearly[-1], "YEARLY", 29))
+    assert yearly[1:] == [
+        date(2025, 2, 28),
+        date(2026, 2, 28),
+        date(2027, 2, 28),
+        date(2028, 2, 29),
+    ]
+    assert recurrence.next_occurrence(date(2023, 12, 31), BillCadence.MONTHLY) == (
+        date(2024, 1, 31)
+    )
+    assert recurrence.next_occurrence(date(2024, 2, 26), "WEEKLY") == date(2024, 3, 4)
+    assert recurrence.next_occurrence(date(2024, 2, 26), "ONCE") is None
+
+
+_bills = st.lists(
+    st.tuples(
+        st.dates(date(2023, 1, 1), date(2026, 12, 31)),
+        st.sampled_from(list(BillCadence)),
+        st.one_of(st.none(), st.integers(1, 31)),
+    ),
+    max_size=8,
+)
+
+
+@given(
+    bills=_bills,
+    until=st.dates(date(2024, 1, 1), date(2027, 12, 31)),
+    start=st.one_of(st.none(), st.dates(date(2023, 1, 1), date(2026, 12, 31))),
+)
+@settings(max_examples=200, deadline=None)
+def test_project_matches_stepping_each_bill(bills, until, start):
+    expected = []
+    for i, (due, cadence, anchor) in enumerate(bills):
+        anchor = anchor or due.day
+        while due is not None and due < until:
+            if start is None or due >= start:
+                expected.append((due, i))
+            due = recurrence.next_occurrence(due, cadence, anchor)
+    positions, dates = recurrence.project(
+        *zip(*bills) if bills else ((), (), ()), until, start=start
+    )
+    assert list(zip(dates.tolist(), positions.tolist())) == sorted(expected)
+
+
+def test_cashflow_projects_active_bills(client, auth_header):
+    today = date.today()
+    for name, cadence, due in [
+        ("Rent", "MONTHLY", today),
+        ("Gym", "WEEKLY", today),
+        ("Fee", "ONCE", today + timedelta(days=5)),
+        ("Car", "YEARLY", today + timedelta(days=400)),
+    ]:
+        payload = {
+            "name": name,
+            "amount": 10,
+            "cadence": cadence,
+            "next_due_date": due.isoformat(),
+        }
+        assert (
+            client.post("/bills", json=payload, headers=auth_header).status_code == 201
+        )
+
+    r = client.get("/bills/cashflow?months=2", headers=auth_header)
+    assert r.status_code == 200
+    data = r.get_json()
+    until = recurrence.add_months(today, 2)
+    assert data["until"] == until.isoformat()
+    names = [o["name"] for o in data["occurrences"]]
+    weeks = len(range(0, (until - today).days, 7))
+    assert sorted(names) == sorted(["Rent"] * 2 + ["Gym"] * weeks + ["Fee"])
+    dates = [o["date"] for o in data["occurrences"]]
+    assert dates == sorted(dates)
+    assert sum(t["amount"] for t in data["totals"]) == 10.0 * len(names)
+
+    r = client.get("/bills/cashflow?months=0", headers=auth_header)
+    assert r.status_code == 400
+
+
+def test_cashflow_starts_overdue_bills_at_their_next_occurrence(client, auth_header):
+    today = date.today()
+    # Due on the 31st and never paid since January 2024.
+    due = date(2024, 1, 31)
+    for name, cadence in [("Rent", "MONTHLY"), ("Fee", "ONCE")]:
+        payload = {
+            "name": name,
+            "amount": 100,
+            "cadence": cadence,
+            "next_due_date": due.isoformat(),
+        }
+        assert (
+            client.post("/bills", json=payload, headers=auth_header).status_code == 201
+        )
+
+    data = client.get("/bills/cashflow?months=3", headers=auth_header).get_json()
+    dates = [date.fromisoformat(o["date"]) for o in data["occurrences"]]
+    assert {o["name"] for o in data["occurrences"]} == {"Rent"}
+    assert len(dates) == 3
+    assert min(dates) >= today
+    # Still anchored on the 31st: the last day of each month.
+    assert all((d + timedelta(days=1)).day == 1 for d in dates)
+    assert [t["month"] for t in data["totals"]] == sorted(
+        {d.strftime("%Y-%m") for d in dates}
+    )
+    assert sum(t["amount"] for t in data["totals"]) == 300.0
@@ -1,4 +1,12 @@
-from datetime import date, timedelta
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+from app import json_provider
+from app.json_provider import OrjsonProvider
+from app.services.cache import cache_get_raw, dashboard_summary_key
 
 
 def test_dashboard_summary_returns_live_data(client, auth_header):
@@ -108,3 +116,114 @@ def test_dashboard_summary_supports_month_filter(client, auth_header):
     data_b = r.get_json()
     assert data_b["period"]["month"] == month_b.strftime("%Y-%m")
     assert data_b["summary"]["monthly_expenses"] == 999.0
+
+
+def test_month_range_is_half_open():
+    from app.services.queries import month_range
+
+    assert month_range("2026-02") == (date(2026, 2, 1), date(2026, 3, 1))
+    assert month_range("2026-12") == (date(2026, 12, 1), date(2027, 1, 1))
+
+
+def test_dashboard_summary_aggregates_month_from_rollups(
+    app_fixture, client, auth_header
+):
+    from sqlalchemy import event
+
+    from app.extensions import db
+
+    r = client.post("/categories", json={"name": "Food"}, headers=auth_header)
+    food_id = r.get_json()["id"]
+    r = client.post("/categories", json={"name": "Rent"}, headers=auth_header)
+    rent_id = r.get_json()["id"]
+    day = date.today().isoformat()
+    for amount, desc, etype, cat in (
+        (1000, "Salary", "INCOME", None),
+        (0.1, "Gum", "EXPENSE", food_id),
+        (0.2, "Mints", "EXPENSE", food_id),
+        (700, "Rent", "EXPENSE", rent_id),
+        (25, "Refund", "INCOME", food_id),
+    ):
+        r = client.post(
+            "/expenses",
+            json={
+                "amount": amount,
+                "description": desc,
+                "date": day,
+                "expense_type": etype,
+                "category_id": cat,
+            },
+            headers=auth_header,
+        )
+        assert r.status_code == 201
+
+    statements: list[str] = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app_fixture.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _before)
+    try:
+        r = client.get("/dashboard/summary", headers=auth_header)
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+    assert r.status_code == 200
+    payload = r.get_json()
+    assert payload["errors"] == []
+    assert payload["summary"]["monthly_income"] == 1025.0
+    assert payload["summary"]["monthly_expenses"] == 700.3
+    assert payload["summary"]["net_flow"] == 324.7
+    breakdown = payload["category_breakdown"]
+    assert [c["category_name"] for c in breakdown] == ["Rent", "Food"]
+    assert breakdown[1]["amount"] == 0.3
+    assert not [s for s in statements if "expenses.spent_at >=" in s]
+    assert len([s for s in statements if "FROM monthly_rollups" in s]) == 1
+
+
+def test_dashboard_cache_hit_serves_stored_response_bytes(
+    client, auth_header, monkeypatch
+):
+    client.post(
+        "/expenses", json={"amount": 5, "description": "Tea"}, headers=auth_header
+    )
+    miss = client.get("/dashboard/summary", headers=auth_header)
+    assert miss.status_code == 200
+    stored = cache_get_raw(dashboard_summary_key(1, date.today().strftime("%Y-%m")))
+    assert stored == miss.data
+    assert miss.data.endswith(b"\n")
+
+    def _no_decode(*args, **kwargs):
+        raise AssertionError("cache hit was decoded")
+
+    monkeypatch.setattr(json_provider, "loads", _no_decode)
+    monkeypatch.setattr(OrjsonProvider, "response", _no_decode)
+    hit = client.get("/dashboard/summary", headers=auth_header)
+    assert hit.status_code == 200
+    assert hit.mimetype == "application/json"
+    assert hit.data == miss.data
+
+
+def test_orjson_provider_matches_default_provider(app_fixture):
+    payload = {
+        "b": [1, 2.5, None, True],
+        "a": {"when": date(2026, 3, 4), "at": datetime(2026, 3, 4, 5, 6, 7)},
+        "amount": Decimal("12.30"),
+        "id": uuid.UUID(int=7),
+        "text": "caf\u00e9",
+    }
+    fast, default = OrjsonProvider(app_fixture), DefaultJSONProvider(app_fixture)
+    assert isinstance(app_fixture.json, OrjsonProvider)
+    assert fast.loads(fast.dumps(payload)) == default.loads(default.dumps(payload))
+    assert list(fast.loads(fast.dumps(payload))) == [
+        "a",
+        "amount",
+        "b",
+        "id",
+        "text",
+    ]
+    with app_fixture.app_context():
+        body = fast.response(payload).get_data()
+        assert body.endswith(b"\n")
+        assert fast.loads(body) == default.loads(default.response(payload).get_data())
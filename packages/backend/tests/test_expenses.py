@@ -1,5 +1,16 @@
+import time
+from contextlib import contextmanager
+from datetime import date
 from io import BytesIO
 
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+from sqlalchemy import event
+
+from app.extensions import db
+from app.services.cache import cache_get, cache_set, dashboard_summary_key
+
 
 def _create_category(client, auth_header, name="General"):
     r = client.post("/categories", json={"name": name}, headers=auth_header)
@@ -9,6 +20,26 @@ def _create_category(client, auth_header, name="General"):
     return r.get_json()[0]["id"]
 
 
+@contextmanager
+def _count_statements(app):
+    statements: list[str] = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _before)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+
+
+def _count(statements: list[str], prefix: str) -> int:
+    return sum(1 for s in statements if s.upper().startswith(prefix.upper()))
+
+
 def test_expenses_crud_filters_and_canonical_fields(client, auth_header):
     cat_id = _create_category(client, auth_header)
 
@@ -166,3 +197,692 @@ def test_expense_import_preview_pdf_fallback_without_gemini(
     assert tx[1]["description"] == "Payroll Deposit"
     assert tx[1]["amount"] == 2500.0
     assert tx[1]["expense_type"] == "INCOME"
+
+
+def test_statement_extraction_is_cached_by_content(
+    app_fixture, client, auth_header, monkeypatch, metrics_header
+):
+    from app.extensions import redis_binary_client
+    from app.services import expense_import
+
+    app_fixture.config["GEMINI_API_KEY"] = "test-key"
+    calls = {"pdf": 0, "gemini": 0}
+
+    def _fake_pdf_text(_data):
+        calls["pdf"] += 1
+        return "statement text"
+
+    def _fake_gemini(text, api_key, model):
+        calls["gemini"] += 1
+        return [
+            {"date": "2026-02-10", "amount": i + 0.5, "description": f"Item {i}"}
+            for i in range(200)
+        ]
+
+    monkeypatch.setattr(expense_import, "_extract_pdf_text", _fake_pdf_text)
+    monkeypatch.setattr(expense_import, "_extract_with_gemini", _fake_gemini)
+
+    def _upload(payload: bytes):
+        r = client.post(
+            "/expenses/import/preview",
+            data={"file": (BytesIO(payload), "statement.pdf")},
+            content_type="multipart/form-data",
+            headers=auth_header,
+        )
+        assert r.status_code == 200
+        return r.get_json()
+
+    first = _upload(b"%PDF-1.4 same bytes")
+    second = _upload(b"%PDF-1.4 same bytes")
+    assert second == first
+    assert calls == {"pdf": 1, "gemini": 1}
+
+    _upload(b"%PDF-1.4 other bytes")
+    assert calls == {"pdf": 2, "gemini": 2}
+
+    key = expense_import._extract_cache_key(b"%PDF-1.4 same bytes", "gemini-1.5-flash")
+    assert redis_binary_client.get(key)[:1] == b"z"
+    assert redis_binary_client.ttl(key) > 0
+
+    r = client.get("/metrics", headers=metrics_header)
+    counters = r.get_json()["counters"]
+    assert counters["import_extract_cache.hits"] == 1
+    assert counters["import_extract_cache.misses"] == 2
+    assert counters["import_extract_cache.bytes_saved"] == len(b"%PDF-1.4 same bytes")
+
+
+def test_statement_extraction_cache_skips_failed_gemini_runs(
+    app_fixture, client, auth_header, monkeypatch, metrics_header
+):
+    from app.services import expense_import
+
+    app_fixture.config["GEMINI_API_KEY"] = "test-key"
+    monkeypatch.setattr(
+        expense_import,
+        "_extract_pdf_text",
+        lambda _data: "2026-02-10 Coffee Shop -4.50",
+    )
+
+    def _failing_gemini(text, api_key, model):
+        raise RuntimeError("upstream timeout")
+
+    monkeypatch.setattr(expense_import, "_extract_with_gemini", _failing_gemini)
+    for _ in range(2):
+        r = client.post(
+            "/expenses/import/preview",
+            data={"file": (BytesIO(b"%PDF-1.4 flaky"), "statement.pdf")},
+            content_type="multipart/form-data",
+            headers=auth_header,
+        )
+        assert r.status_code == 200
+        assert r.get_json()["total"] == 1
+    counters = client.get("/metrics", headers=metrics_header).get_json()["counters"]
+    assert counters["import_extract_cache.misses"] == 2
+    assert "import_extract_cache.hits" not in counters
+
+
+def test_gemini_extraction_sends_chunks_concurrently(fake_gemini, monkeypatch):
+    import time
+
+    from app.services import expense_import
+
+    monkeypatch.setattr(expense_import._settings, "gemini_chunk_chars", 1000)
+    monkeypatch.setattr(expense_import._settings, "gemini_max_concurrency", 8)
+    pages = [
+        "\n".join(
+            f"2026-03-{day:02d} Shop p{p} n{i} {p * 100 + i}.25"
+            for i, day in enumerate(range(1, 29), start=1)
+        )
+        for p in range(6)
+    ]
+    # Two identical card payments on one page must both survive seam dedupe.
+    pages[2] += "\n2026-03-28 Card payment 50.00\n2026-03-28 Card payment 50.00"
+    text = "\f".join(pages)
+    chunks = expense_import._chunk_statement(text, 1000, 3)
+    assert len(chunks) == 6
+    assert all(c[0].startswith(c[1]) for c in chunks)
+    long_page = "\n".join(f"2026-03-01 Line {i:03d} {'x' * 80} 1.00" for i in range(40))
+    split = expense_import._chunk_statement(long_page, 1000, 2)
+    assert len(split) > 3
+    assert all(len(c) - len(o) <= 1001 for c, o in split)
+
+    fake_gemini.delay = 0.4
+    started = time.monotonic()
+    rows = expense_import._extract_with_gemini(text, "key", "gemini-test")
+    elapsed = time.monotonic() - started
+
+    assert fake_gemini.requests == 6
+    assert fake_gemini.max_in_flight > 1
+    assert elapsed < 0.4 * 3
+    expected = [line for page in pages for line in page.split("\n")]
+    assert [f"{r['date']} {r['description']} {r['amount']:.2f}" for r in rows] == (
+        expected
+    )
+
+
+def test_provider_clients_reuse_connections_per_process(
+    client, fake_gemini, monkeypatch, metrics_header
+):
+    from app.services import expense_import, http_clients
+
+    monkeypatch.setattr(http_clients, "_sessions", {})
+    for _ in range(3):
+        rows = expense_import._extract_with_gemini(
+            "2026-03-01 Shop 4.00", "key", "gemini-test"
+        )
+        assert rows == [{"date": "2026-03-01", "amount": 4.0, "description": "Shop"}]
+    counters = client.get("/metrics", headers=metrics_header).get_json()["counters"]
+    assert counters["http.session.requests"] == 3
+    assert counters["http.session.connections_opened"] == 1
+
+    session = http_clients.session()
+    assert http_clients.session() is session
+    # A forked worker must not inherit the parent's pooled sockets.
+    monkeypatch.setattr(http_clients.os, "getpid", lambda: -1)
+    assert http_clients.session() is not session
+
+    monkeypatch.setattr(http_clients._settings, "openai_api_key", "sk-test")
+    openai_client = http_clients.openai_client()
+    assert openai_client is not None
+    assert http_clients.openai_client() is openai_client
+
+
+def test_pdf_pages_are_extracted_in_parallel_in_order(statement_pdf, monkeypatch):
+    from app.services import expense_import
+
+    pdf = statement_pdf(pages=6, lines_per_page=3)
+    serial = expense_import._extract_pdf_text(pdf)
+    monkeypatch.setattr(expense_import.os, "cpu_count", lambda: 2)
+    monkeypatch.setattr(expense_import._settings, "pdf_extract_workers", 2)
+    monkeypatch.setattr(expense_import._settings, "pdf_parallel_min_pages", 2)
+    assert expense_import._extract_pdf_text(pdf) == serial
+    lines = serial.splitlines()
+    assert lines[0].startswith("2026-03-01 Page 0 item 0")
+    assert lines[-1].startswith("2026-03-03 Page 5 item 2")
+
+
+def test_pdf_serial_extraction_enforces_page_timeout(statement_pdf, monkeypatch):
+    import threading
+
+    from app.services import expense_import
+
+    pdf = statement_pdf(pages=3, lines_per_page=2)
+    monkeypatch.setattr(expense_import.os, "cpu_count", lambda: 1)
+    monkeypatch.setattr(expense_import._settings, "pdf_extract_workers", 4)
+    monkeypatch.setattr(expense_import._settings, "pdf_page_timeout_seconds", 7.0)
+    timeouts = []
+    extract_page = expense_import._extract_page
+
+    def _recording(reader, index, timeout=None):
+        timeouts.append(timeout)
+        return extract_page(reader, index, timeout)
+
+    monkeypatch.setattr(expense_import, "_extract_page", _recording)
+    serial = expense_import._extract_pdf_text(pdf)
+    assert timeouts == [7.0, 7.0, 7.0]
+
+    # Off the main thread there is no SIGALRM, so one worker process is used.
+    calls, results = [], []
+    extract_pool = expense_import._extract_pages_pool
+
+    def _recording_pool(data, page_count, workers):
+        calls.append((page_count, workers))
+        return extract_pool(data, page_count, workers)
+
+    monkeypatch.setattr(expense_import, "_extract_pages_pool", _recording_pool)
+    thread = threading.Thread(
+        target=lambda: results.append(expense_import._extract_pdf_text(pdf))
+    )
+    thread.start()
+    thread.join()
+    assert calls == [(3, 1)]
+    assert results == [serial]
+
+
+def test_pdf_page_timeout_leaves_page_empty():
+    import time
+
+    from app.services import expense_import
+
+    class _SlowPage:
+        def extract_text(self):
+            time.sleep(5)
+            return "never"
+
+    class _Reader:
+        pages = [_SlowPage()]
+
+    started = time.monotonic()
+    assert expense_import._extract_page(_Reader(), 0, timeout=0.05) == ""
+    assert time.monotonic() - started < 2
+
+
+def test_expense_import_duplicate_detection_uses_fixed_queries(
+    app_fixture, client, auth_header
+):
+    lines = ["date,amount,description"]
+    for i in range(1000):
+        lines.append(f"2026-01-{(i % 28) + 1:02d},{i + 1}.25,Row {i}")
+    data = {"file": (BytesIO("\n".join(lines).encode("utf-8")), "statement.csv")}
+
+    with _count_statements(app_fixture) as statements:
+        r = client.post(
+            "/expenses/import/preview",
+            data=data,
+            content_type="multipart/form-data",
+            headers=auth_header,
+        )
+    assert r.status_code == 200
+    preview = r.get_json()
+    assert preview["total"] == 1000
+    assert preview["duplicates"] == 0
+    assert _count(statements, "SELECT") == 1
+
+    with _count_statements(app_fixture) as statements:
+        r = client.post(
+            "/expenses/import/commit",
+            json={"transactions": preview["transactions"]},
+            headers=auth_header,
+        )
+    assert r.status_code == 201
+    assert r.get_json() == {"inserted": 1000, "duplicates": 0}
+    assert _count(statements, "SELECT") == 1
+    assert _count(statements, "INSERT INTO expenses") == 1
+
+    with _count_statements(app_fixture) as statements:
+        r = client.post(
+            "/expenses/import/commit",
+            json={"transactions": preview["transactions"]},
+            headers=auth_header,
+        )
+    assert r.get_json() == {"inserted": 0, "duplicates": 1000}
+    assert _count(statements, "SELECT") == 1
+    assert _count(statements, "INSERT INTO expenses") == 0
+
+
+def test_expense_import_commit_bulk_inserts_in_chunks(
+    app_fixture, client, auth_header, monkeypatch
+):
+    monkeypatch.setattr("app.services.expense_import.IMPORT_INSERT_CHUNK_SIZE", 100)
+    rows = [
+        {
+            "date": f"2026-{(i % 2) + 1:02d}-15",
+            "amount": i + 1,
+            "description": f"Row {i}",
+        }
+        for i in range(250)
+    ]
+    rows.append(dict(rows[0]))
+    for ym in ("2026-01", "2026-02"):
+        cache_set(dashboard_summary_key(1, ym), {"stale": True})
+
+    with _count_statements(app_fixture) as statements:
+        r = client.post(
+            "/expenses/import/commit", json={"transactions": rows}, headers=auth_header
+        )
+    assert r.status_code == 201
+    assert r.get_json() == {"inserted": 250, "duplicates": 1}
+    assert _count(statements, "INSERT INTO expenses") == 3
+    for ym in ("2026-01", "2026-02"):
+        assert cache_get(dashboard_summary_key(1, ym)) is None
+
+    r = client.get("/expenses?from=2026-01-01&to=2026-01-31", headers=auth_header)
+    items = r.get_json()
+    assert len(items) == 125
+    assert items[0]["currency"] == "USD"
+
+
+def test_monthly_rollups_follow_expense_writes(app_fixture, client, auth_header):
+    from app.models import MonthlyRollup
+    from app.services import rollups
+
+    cat_id = _create_category(client, auth_header, "Travel")
+    r = client.post(
+        "/expenses",
+        json={"amount": 40, "description": "Train", "date": "2026-03-05"},
+        headers=auth_header,
+    )
+    exp_id = r.get_json()["id"]
+    client.post(
+        "/expenses",
+        json={
+            "amount": 900,
+            "description": "Salary",
+            "date": "2026-03-01",
+            "expense_type": "INCOME",
+        },
+        headers=auth_header,
+    )
+    r = client.patch(
+        f"/expenses/{exp_id}",
+        json={"date": "2026-04-02", "category_id": cat_id, "amount": 55.5},
+        headers=auth_header,
+    )
+    assert r.status_code == 200
+    client.post(
+        "/expenses/import/commit",
+        json={
+            "transactions": [
+                {"date": "2026-04-03", "amount": 12, "description": "Taxi"},
+                {"date": "2026-04-03", "amount": 8, "description": "Bus"},
+            ]
+        },
+        headers=auth_header,
+    )
+
+    with app_fixture.app_context():
+        assert rollups.verify() == []
+        april = {
+            (r.category_id, r.expense_type): (float(r.total_amount), r.tx_count)
+            for r in db.session.query(MonthlyRollup).filter_by(month=date(2026, 4, 1))
+        }
+        assert april == {(cat_id, "EXPENSE"): (55.5, 1), (0, "EXPENSE"): (20.0, 2)}
+
+    r = client.delete(f"/categories/{cat_id}", headers=auth_header)
+    assert r.status_code == 200
+    r = client.delete(f"/expenses/{exp_id}", headers=auth_header)
+    assert r.status_code == 200
+    with app_fixture.app_context():
+        assert rollups.verify() == []
+        assert db.session.query(MonthlyRollup).count() == 2
+
+        db.session.query(MonthlyRollup).update({"tx_count": 99})
+        db.session.commit()
+        assert rollups.verify() != []
+
+    result = app_fixture.test_cli_runner().invoke(args=["rebuild-rollups"])
+    assert result.exit_code == 0, result.output
+    assert "Rollups verified." in result.output
+    with app_fixture.app_context():
+        assert rollups.verify() == []
+
+
+def test_rollup_rebuild_rolls_back_when_verify_fails(
+    app_fixture, client, auth_header, monkeypatch
+):
+    from app.models import MonthlyRollup
+    from app.services import rollups
+
+    client.post(
+        "/expenses",
+        json={"amount": 40, "description": "Train", "date": "2026-03-05"},
+        headers=auth_header,
+    )
+    with app_fixture.app_context():
+        db.session.query(MonthlyRollup).delete()
+        db.session.commit()
+        assert rollups.needs_backfill()
+
+    monkeypatch.setattr(rollups, "verify", lambda user_id=None: ["forced mismatch"])
+    result = app_fixture.test_cli_runner().invoke(args=["rebuild-rollups"])
+    assert result.exit_code != 0
+    assert "rolled back" in result.output
+    with app_fixture.app_context():
+        assert db.session.query(MonthlyRollup).count() == 0
+
+    monkeypatch.undo()
+    with app_fixture.app_context():
+        assert rollups.rebuild_verified() == (1, [])
+        assert not rollups.needs_backfill()
+        assert rollups.verify() == []
+
+
+def test_list_expenses_keyset_cursor(client, auth_header):
+    for i in range(5):
+        r = client.post(
+            "/expenses",
+            json={"amount": i + 1, "description": f"Item {i}", "date": "2026-05-10"},
+            headers=auth_header,
+        )
+        assert r.status_code == 201
+    client.post(
+        "/expenses",
+        json={"amount": 9, "description": "Older", "date": "2026-05-01"},
+        headers=auth_header,
+    )
+
+    r = client.get("/expenses?cursor=&page_size=4", headers=auth_header)
+    assert r.status_code == 200
+    first = r.get_json()
+    assert [e["description"] for e in first["items"]] == [
+        "Item 4",
+        "Item 3",
+        "Item 2",
+        "Item 1",
+    ]
+    assert first["next_cursor"]
+
+    # Rows added after the first page must not shift the next one.
+    client.post(
+        "/expenses",
+        json={"amount": 3, "description": "Newest", "date": "2026-05-20"},
+        headers=auth_header,
+    )
+    r = client.get(
+        f"/expenses?cursor={first['next_cursor']}&page_size=4", headers=auth_header
+    )
+    second = r.get_json()
+    assert [e["description"] for e in second["items"]] == ["Item 0", "Older"]
+    assert second["next_cursor"] is None
+
+    r = client.get("/expenses?cursor=not-a-cursor", headers=auth_header)
+    assert r.status_code == 400
+
+
+def test_list_expenses_full_text_search(client, auth_header):
+    for desc, day in (
+        ("Coffee beans", "2026-06-01"),
+        ("Coffee shop coffee refill", "2026-05-01"),
+        ("Bus ticket", "2026-06-02"),
+        ("Groceries (50% off)", "2026-06-03"),
+    ):
+        r = client.post(
+            "/expenses",
+            json={"amount": 5, "description": desc, "date": day},
+            headers=auth_header,
+        )
+        assert r.status_code == 201
+
+    r = client.get("/expenses?search=cof", headers=auth_header)
+    assert r.status_code == 200
+    items = r.get_json()
+    # Ranked: the note mentioning coffee twice outranks the newer one.
+    assert [e["description"] for e in items] == [
+        "Coffee shop coffee refill",
+        "Coffee beans",
+    ]
+
+    r = client.get("/expenses?search=shop%20cof", headers=auth_header)
+    assert [e["description"] for e in r.get_json()] == ["Coffee shop coffee refill"]
+
+    bus_id = client.get("/expenses?search=bus", headers=auth_header).get_json()[0]["id"]
+    client.patch(
+        f"/expenses/{bus_id}", json={"description": "Train ticket"}, headers=auth_header
+    )
+    assert client.get("/expenses?search=bus", headers=auth_header).get_json() == []
+    r = client.get("/expenses?search=train&cursor=", headers=auth_header)
+    assert [e["id"] for e in r.get_json()["items"]] == [bus_id]
+
+    r = client.get("/expenses?search=(", headers=auth_header)
+    assert [e["description"] for e in r.get_json()] == ["Groceries (50% off)"]
+
+
+_DATE_SHAPES = (
+    "%Y-%m-%d",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%m-%d-%Y",
+    "%d-%m-%Y",
+    "%Y%m%d",
+    "%m/%d/%y",
+    "%-m/%-d/%Y",
+    " %d-%m-%Y ",
+)
+_raw_dates = st.one_of(
+    st.builds(
+        lambda d, fmt: d.strftime(fmt), st.dates(), st.sampled_from(_DATE_SHAPES)
+    ),
+    st.text(alphabet="0123456789/- T:", max_size=12),
+    st.sampled_from([None, "", 20260301, "2026-02-30", "13/13/2026"]),
+)
+_raw_amounts = st.one_of(
+    st.builds(
+        lambda d, fmt: fmt.format(d),
+        st.decimals(min_value=-(10**9), max_value=10**9, places=2),
+        st.sampled_from(["{}", "${:,}", "({})", "USD {:,}", "{:,} €", " -{} "]),
+    ),
+    st.text(alphabet="0123456789.,-$() €", max_size=12),
+    st.floats(allow_nan=True, allow_infinity=True),
+    st.integers(),
+    st.sampled_from([None, "", "abc", "1.2.3", "--5", "٣.50"]),
+)
+
+
+@given(dates=st.lists(_raw_dates), amounts=st.lists(_raw_amounts))
+@settings(max_examples=300, deadline=None)
+def test_import_normalizer_matches_reference_functions(dates, amounts):
+    from app.services import expense_import
+
+    normalizer = expense_import.ImportNormalizer()
+    # Twice over, so the second pass exercises learned formats and the memo.
+    for value in dates + dates:
+        assert normalizer.date(value) == expense_import._normalize_date(value)
+    for value in amounts + amounts:
+        got = normalizer.amount(value)
+        want = expense_import._normalize_amount(value)
+        assert (type(got), str(got)) == (type(want), str(want))
+
+
+def test_csv_statement_is_parsed_incrementally():
+    from app.services import expense_import
+
+    class _Upload:
+        def __init__(self, payload: bytes):
+            self._buf = BytesIO(payload)
+            self.reads = 0
+
+        def read(self, size=-1):
+            self.reads += 1
+            return self._buf.read(size)
+
+    body = "".join(f"2026-07-{(i % 28) + 1:02d},{i}.50,Café {i}\n" for i in range(5000))
+    upload = _Upload(("﻿date,amount,description\n" + body).encode("utf-8"))
+    rows = expense_import.extract_transactions_from_statement(
+        filename="big.csv", content_type="text/csv", data=upload, gemini_api_key=None
+    )
+    batches = expense_import.iter_batches(
+        expense_import.iter_normalized_rows(rows), size=100
+    )
+    first = next(batches)
+    assert len(first) == 100
+    assert first[0]["description"] == "Café 0"
+    assert upload.reads == 1
+
+    remaining = sum(len(b) for b in batches)
+    assert remaining == 4900
+    assert upload.reads > 2
+
+
+def test_expense_import_preview_counts_duplicates_across_batches(
+    client, auth_header, monkeypatch
+):
+    monkeypatch.setattr("app.services.expense_import.IMPORT_BATCH_SIZE", 3)
+    client.post(
+        "/expenses",
+        json={"amount": 4, "description": "Row 4", "date": "2026-08-04"},
+        headers=auth_header,
+    )
+    lines = ["date,amount,description"]
+    lines += [f"2026-08-0{i},{i},Row {i}" for i in range(1, 8)]
+    data = {"file": (BytesIO("\n".join(lines).encode("utf-8")), "statement.csv")}
+    r = client.post(
+        "/expenses/import/preview",
+        data=data,
+        content_type="multipart/form-data",
+        headers=auth_header,
+    )
+    assert r.status_code == 200
+    preview = r.get_json()
+    assert preview["total"] == 7
+    assert preview["duplicates"] == 1
+
+    rows = preview["transactions"] + preview["transactions"][:2]
+    r = client.post(
+        "/expenses/import/commit", json={"transactions": rows}, headers=auth_header
+    )
+    assert r.get_json() == {"inserted": 6, "duplicates": 3}
+
+
+def test_import_job_runs_preview_in_worker(app_fixture, client, auth_header):
+    from app.services import import_jobs
+
+    client.post(
+        "/expenses",
+        json={"amount": 10.5, "description": "Coffee", "date": "2026-02-10"},
+        headers=auth_header,
+    )
+    csv_data = "date,amount,description\n2026-02-10,10.50,Coffee\n2026-02-11,22,Lunch\n"
+    r = client.post(
+        "/expenses/import/jobs",
+        data={"file": (BytesIO(csv_data.encode("utf-8")), "statement.csv")},
+        content_type="multipart/form-data",
+        headers=auth_header,
+    )
+    assert r.status_code == 202
+    job_id = r.get_json()["job_id"]
+
+    r = client.get(f"/expenses/import/jobs/{job_id}", headers=auth_header)
+    assert r.get_json()["status"] == "queued"
+    assert r.get_json()["result"] is None
+
+    with app_fixture.app_context():
+        assert import_jobs.work_once(timeout=1) is True
+
+    r = client.get(f"/expenses/import/jobs/{job_id}", headers=auth_header)
+    job = r.get_json()
+    assert job["status"] == "done"
+    assert job["processed"] == 2
+    assert job["result"]["total"] == 2
+    assert job["result"]["duplicates"] == 1
+    assert job["result"]["transactions"][1]["description"] == "Lunch"
+
+    r = client.get("/expenses/import/jobs/unknown", headers=auth_header)
+    assert r.status_code == 404
+
+
+def test_import_job_memory_backend_reports_failures(app_fixture, client, auth_header):
+    app_fixture.config["IMPORT_JOB_BACKEND"] = "memory"
+    r = client.post(
+        "/expenses/import/jobs",
+        data={"file": (BytesIO(b"not a statement"), "notes.txt")},
+        content_type="multipart/form-data",
+        headers=auth_header,
+    )
+    job_id = r.get_json()["job_id"]
+
+    result = app_fixture.test_cli_runner().invoke(args=["import-worker", "--burst"])
+    assert result.exit_code == 0, result.output
+
+    r = client.get(f"/expenses/import/jobs/{job_id}", headers=auth_header)
+    job = r.get_json()
+    assert job["status"] == "failed"
+    assert job["error"] == "Only PDF and CSV files are supported"
+
+
+def test_import_job_from_dead_worker_is_requeued(
+    app_fixture, client, auth_header, monkeypatch
+):
+    from app.services import expense_import, import_jobs
+
+    app_fixture.config["IMPORT_JOB_STALE_SECONDS"] = 60
+    app_fixture.config["IMPORT_JOB_MAX_ATTEMPTS"] = 2
+    csv_data = b"date,amount,description\n2026-02-11,22,Lunch\n"
+
+    def submit():
+        r = client.post(
+            "/expenses/import/jobs",
+            data={"file": (BytesIO(csv_data), "statement.csv")},
+            content_type="multipart/form-data",
+            headers=auth_header,
+        )
+        return r.get_json()["job_id"]
+
+    def worker_dies(*args, **kwargs):
+        raise SystemExit("worker killed")
+
+    job_id = submit()
+    with app_fixture.app_context():
+        backend = import_jobs.get_backend()
+        with monkeypatch.context() as m:
+            m.setattr(expense_import, "preview_statement", worker_dies)
+            with pytest.raises(SystemExit):
+                import_jobs.run_job(backend.dequeue(1))
+        assert backend.get(job_id)["status"] == "running"
+        assert backend.get_payload(job_id) == csv_data
+
+        # Heartbeat still fresh: nothing to recover yet.
+        assert import_jobs.requeue_stale() == 0
+        backend.heartbeat(job_id, time.time() - 120)
+        assert import_jobs.requeue_stale() == 1
+        assert backend.get(job_id)["status"] == "queued"
+
+        assert import_jobs.work_once(timeout=1) is True
+        job = backend.get(job_id)
+        assert job["status"] == "done"
+        assert job["attempts"] == 2
+        assert backend.get_payload(job_id) is None
+        assert backend.stale(time.time()) == []
+
+        # A job that keeps killing its worker is failed after max attempts.
+        job_id = submit()
+        with monkeypatch.context() as m:
+            m.setattr(expense_import, "preview_statement", worker_dies)
+            for _ in range(2):
+                with pytest.raises(SystemExit):
+                    import_jobs.run_job(backend.dequeue(1))
+                backend.heartbeat(job_id, time.time() - 120)
+                assert import_jobs.requeue_stale() == 1
+        job = backend.get(job_id)
+        assert job["status"] == "failed"
+        assert job["error"] == "import worker stopped responding"
+        assert backend.get_payload(job_id) is None
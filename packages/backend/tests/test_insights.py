@@ -0,0 +1,279 @@
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.extensions import redis_binary_client
+from app.services import expense_snapshot, forecast
+from app.services.cache import cache_get_or_compute
+
+
+def test_budget_suggestion_is_cached_until_expenses_change(
+    client, auth_header, monkeypatch, metrics_header
+):
+    calls = []
+
+    def _fake_suggestion(uid, ym):
+        calls.append((uid, ym))
+        return {"month": ym, "suggested_total": 100.0 * len(calls), "method": "fake"}
+
+    monkeypatch.setattr(
+        "app.routes.insights.monthly_budget_suggestion", _fake_suggestion
+    )
+    first = client.get("/insights/budget-suggestion", headers=auth_header)
+    second = client.get("/insights/budget-suggestion", headers=auth_header)
+    assert first.status_code == second.status_code == 200
+    assert second.get_json() == first.get_json()
+    assert len(calls) == 1
+
+    r = client.post(
+        "/expenses",
+        json={"amount": 12.5, "description": "Lunch"},
+        headers=auth_header,
+    )
+    assert r.status_code == 201
+    third = client.get("/insights/budget-suggestion", headers=auth_header)
+    assert third.get_json()["suggested_total"] == 200.0
+    assert len(calls) == 2
+
+    counters = client.get("/metrics", headers=metrics_header).get_json()["counters"]
+    assert counters["cache.insights.hits"] == 1
+    assert counters["cache.insights.misses"] == 2
+
+
+def test_budget_suggestion_fallback_is_not_cached_while_openai_is_set(
+    client, auth_header, monkeypatch, metrics_header
+):
+    from app.services import ai, http_clients
+
+    class _FailingOpenAI:
+        class chat:
+            class completions:
+                @staticmethod
+                def create(**kwargs):
+                    raise TimeoutError("provider timed out")
+
+    monkeypatch.setattr(http_clients, "openai_client", lambda: _FailingOpenAI)
+    first = client.get("/insights/budget-suggestion", headers=auth_header)
+    assert first.get_json()["method"] == "heuristic"
+
+    # The provider recovers: the next request asks it again.
+    monkeypatch.setattr(
+        "app.routes.insights.monthly_budget_suggestion",
+        lambda uid, ym: {"month": ym, "method": "openai"},
+    )
+    second = client.get("/insights/budget-suggestion", headers=auth_header)
+    assert second.get_json()["method"] == "openai"
+    third = client.get("/insights/budget-suggestion", headers=auth_header)
+    assert third.get_json()["method"] == "openai"
+    counters = client.get("/metrics", headers=metrics_header).get_json()["counters"]
+    assert counters["cache.insights.misses"] == 2
+    assert counters["cache.insights.hits"] == 1
+
+    # Without a key the heuristic is the real answer and is cached as usual.
+    monkeypatch.setattr(http_clients, "openai_client", lambda: None)
+    assert not ai.is_fallback_suggestion({"method": "heuristic"})
+
+
+def test_budget_suggestion_lock_outlasts_openai_retries(monkeypatch):
+    from app.services import http_clients
+
+    monkeypatch.setattr(http_clients._settings, "http_connect_timeout_seconds", 5.0)
+    monkeypatch.setattr(http_clients._settings, "http_read_timeout_seconds", 45.0)
+    monkeypatch.setattr(http_clients._settings, "http_retries", 2)
+    assert http_clients.openai_call_budget_seconds() == 50 * 3 + 8 * 2
+
+
+def test_concurrent_misses_compute_once(client, metrics_header):
+    calls = []
+
+    def _slow_compute():
+        calls.append(1)
+        time.sleep(0.3)
+        return {"suggested_total": 42}
+
+    results = []
+
+    def _request():
+        results.append(
+            cache_get_or_compute(
+                "insights:1:2026-08", _slow_compute, 60, metric="cache.insights"
+            )
+        )
+
+    threads = [threading.Thread(target=_request) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [{"suggested_total": 42}] * 5
+    counters = client.get("/metrics", headers=metrics_header).get_json()["counters"]
+    assert counters["cache.insights.misses"] == 1
+    assert counters["cache.insights.coalesced"] == 4
+
+
+def test_forecast_projects_history_and_bills(client, auth_header, metrics_header):
+    today = date.today()
+    for back in range(1, 29):
+        r = client.post(
+            "/expenses",
+            json={
+                "amount": 10,
+                "description": "Groceries",
+                "date": (today - timedelta(days=back)).isoformat(),
+            },
+            headers=auth_header,
+        )
+        assert r.status_code == 201
+    bill = {
+        "name": "Internet",
+        "amount": 50,
+        "cadence": "ONCE",
+        "next_due_date": (today + timedelta(days=5)).isoformat(),
+    }
+    client.post("/bills", json=bill, headers=auth_header)
+
+    r = client.get("/insights/forecast", headers=auth_header)
+    assert r.status_code == 200
+    data = r.get_json()
+    assert data["history_days"] == 28
+    assert data["baseline"] == -10.0
+    assert data["rolling_mean"] == {"7": -10.0, "30": -10.0}
+    days = data["days"]
+    assert len(days) == forecast.HORIZON_DAYS
+    assert days[0]["date"] == today.isoformat()
+    assert [d["bills"] for d in days[4:7]] == [0.0, 50.0, 0.0]
+    assert days[5]["net"] == -60.0
+    assert days[-1]["balance"] == -10.0 * forecast.HORIZON_DAYS - 50.0
+
+    offset = client.get("/insights/forecast?balance=1000", headers=auth_header)
+    assert offset.get_json()["days"][-1]["balance"] == days[-1]["balance"] + 1000
+
+    # Paying the bill and adding expenses both clear the cached forecast.
+    bills = client.get("/bills", headers=auth_header).get_json()
+    client.post(f"/bills/{bills[0]['id']}/pay", headers=auth_header)
+    data = client.get("/insights/forecast", headers=auth_header).get_json()
+    assert sum(d["bills"] for d in data["days"]) == 0.0
+    counters = client.get("/metrics", headers=metrics_header).get_json()["counters"]
+    assert counters["cache.forecast.hits"] == 1
+    assert counters["cache.forecast.misses"] == 2
+
+
+def test_forecast_counts_an_overdue_bill_once(client, auth_header):
+    today = date.today()
+    # Weekly, unpaid for about two years, never due on a weekday like today's.
+    due = today - timedelta(days=7 * 104 + 3)
+    bill = {
+        "name": "Cleaner",
+        "amount": 20,
+        "cadence": "WEEKLY",
+        "next_due_date": due.isoformat(),
+    }
+    client.post("/bills", json=bill, headers=auth_header)
+
+    days = client.get("/insights/forecast", headers=auth_header).get_json()["days"]
+    bills = [d["bills"] for d in days]
+    assert bills[0] == 20.0
+    assert bills[1:5] == [0.0, 0.0, 0.0, 20.0]
+    assert bills.count(20.0) == 1 + len(range(4, forecast.HORIZON_DAYS, 7))
+    assert days[-1]["balance"] == -sum(bills)
+
+
+def test_forecast_learns_weekday_and_month_seasonality():
+    start = date(2016, 1, 1)
+    days = np.datetime64(start, "D") + np.arange(10 * 365)
+    weekdays = (days.astype(np.int64) + 3) % 7
+    months = days.astype("datetime64[M]").astype(np.int64) % 12
+    # Spend 70 every Saturday and an extra 5 a day in December.
+    flow = np.where(weekdays == 5, -70.0, 0.0) - np.where(months == 11, 5.0, 0.0)
+    today = (days[-1] + 1).item()
+
+    out = forecast.build_forecast(start, flow, np.zeros(90), today)
+    weekday = out["weekday_effect"]
+    assert weekday.index(min(weekday)) == 5
+    assert max(weekday) - min(weekday) > 60
+    month = out["month_effect"]
+    assert month.index(min(month)) == 11
+    saturdays = [
+        d["net"] for d in out["days"] if date.fromisoformat(d["date"]).weekday() == 5
+    ]
+    others = [
+        d["net"] for d in out["days"] if date.fromisoformat(d["date"]).weekday() != 5
+    ]
+    assert max(saturdays) < min(others)
+
+
+def _assert_snapshot_matches_db(app_fixture):
+    with app_fixture.app_context():
+        stored = expense_snapshot.load(1)
+        fresh = expense_snapshot.build(1)
+        for name in ("ids", "days", "cents", "categories", "types"):
+            assert getattr(stored, name).tolist() == getattr(fresh, name).tolist()
+        return stored
+
+
+def test_expense_snapshot_is_patched_on_writes(app_fixture, client, auth_header):
+    cat = client.post("/categories", json={"name": "Food"}, headers=auth_header)
+    cat_id = cat.get_json()["id"]
+    ids = []
+    for amount, kind in [(12.5, "EXPENSE"), (1000, "INCOME"), (3.2, "EXPENSE")]:
+        r = client.post(
+            "/expenses",
+            json={
+                "amount": amount,
+                "description": "x",
+                "expense_type": kind,
+                "category_id": cat_id,
+                "date": "2026-03-04",
+            },
+            headers=auth_header,
+        )
+        ids.append(r.get_json()["id"])
+    snap = _assert_snapshot_matches_db(app_fixture)
+    assert snap.signed_cents().tolist() == [-1250, 100000, -320]
+    assert redis_binary_client.exists(expense_snapshot.snapshot_key(1))
+
+    client.patch(
+        f"/expenses/{ids[0]}",
+        json={"amount": 20, "date": "2026-04-01"},
+        headers=auth_header,
+    )
+    client.delete(f"/expenses/{ids[1]}", headers=auth_header)
+    client.delete(f"/categories/{cat_id}", headers=auth_header)
+    client.post(
+        "/expenses", json={"amount": 1, "description": "y"}, headers=auth_header
+    )
+    snap = _assert_snapshot_matches_db(app_fixture)
+    assert snap.signed_cents().tolist() == [-2000, -320, -100]
+    assert snap.categories.tolist() == [0, 0, 0]
+
+
+def test_expense_snapshot_build_racing_a_write_is_not_stored(app_fixture, monkeypatch):
+    build = expense_snapshot.build
+
+    def _build_while_a_write_lands(user_id):
+        snap = build(user_id)
+        expense_snapshot.record_delete(user_id, 123)
+        return snap
+
+    monkeypatch.setattr(expense_snapshot, "build", _build_while_a_write_lands)
+    with app_fixture.app_context():
+        assert len(expense_snapshot.load(1)) == 0
+    assert not redis_binary_client.exists(expense_snapshot.snapshot_key(1))
+
+
+def test_expense_snapshot_is_compact():
+    rows = [
+        (i, date(2016, 1, 1) + timedelta(days=i % 3650), 12.34, i % 20, "EXPENSE")
+        for i in range(1, 100_001)
+    ]
+    snap = expense_snapshot.ExpenseSnapshot.from_rows(rows)
+    raw = snap.to_bytes()
+    assert snap.nbytes < 3 * 1024 * 1024
+    assert len(raw) < snap.nbytes + 16
+    decoded = expense_snapshot.ExpenseSnapshot.from_bytes(raw)
+    assert decoded.cents.sum() == 1234 * 100_000
+    assert decoded.dates()[-1] == np.datetime64(rows[-1][1])